@@ -22,10 +22,20 @@ import networkx as nx
 # ----------------------------------------------------------------------
 # Types that match GraphDriver
 # ----------------------------------------------------------------------
-NodeId = str
+NodeId = int
 Graph = nx.DiGraph
 
 
+def _iter_children(elem: etree.Element):
+    """Iterate child elements; lxml skips comments itself, no per-child check."""
+    return elem.iterchildren(tag=etree.Element)
+
+
+def _first_child(elem: etree.Element):
+    """First non-comment child of elem, or None (stops at the first match)."""
+    return next(elem.iterchildren(tag=etree.Element), None)
+
+
 # ----------------------------------------------------------------------
 # Base extension class
 # ----------------------------------------------------------------------
@@ -126,9 +136,9 @@ class WorkerExtension(GraphExtension):
                         self._link(worker_nid, arg_nid, "has_arg")
                 else:
                     # Process children of arg element
-                    arg_children = [c for c in arg_elem if c.tag is not etree.Comment]
-                    if arg_children:
-                        arg_nid = self._walk_expression(arg_children[0], worker_nid)
+                    arg_child = _first_child(arg_elem)
+                    if arg_child is not None:
+                        arg_nid = self._walk_expression(arg_child, worker_nid)
                         if arg_nid:
                             self._link(worker_nid, arg_nid, "has_arg")
 
@@ -182,17 +192,17 @@ class WorkerExtension(GraphExtension):
 
             base = elem.find("base")
             if base is not None:
-                base_children = [c for c in base if c.tag is not etree.Comment]
-                if base_children:
-                    base_nid = self._walk_expression(base_children[0], idx_nid)
+                base_child = _first_child(base)
+                if base_child is not None:
+                    base_nid = self._walk_expression(base_child, idx_nid)
                     if base_nid:
                         self._link(idx_nid, base_nid, "base")
 
             idx_val = elem.find("index_value")
             if idx_val is not None:
-                idx_children = [c for c in idx_val if c.tag is not etree.Comment]
-                if idx_children:
-                    idx_nid_val = self._walk_expression(idx_children[0], idx_nid)
+                idx_child = _first_child(idx_val)
+                if idx_child is not None:
+                    idx_nid_val = self._walk_expression(idx_child, idx_nid)
                     if idx_nid_val:
                         self._link(idx_nid, idx_nid_val, "index")
 
@@ -217,10 +227,10 @@ class WorkerExtension(GraphExtension):
         # ----- binary_op -----
         if tag == "binary_op":
             op = elem.get("op", "+")  # Default to + if no operator
-            binop_nid = self._add_node(f"{op}", "BinaryOp", op=op)
+            binop_nid = self._add_node(op, "BinaryOp", op=op)
             self._link(parent_nid, binop_nid, "has_arg")
             # Process left and right operands
-            children = [c for c in elem if c.tag is not etree.Comment]
+            children = list(_iter_children(elem))
             if len(children) >= 1:
                 left_nid = self._walk_expression(children[0], binop_nid)
                 if left_nid:
@@ -234,9 +244,7 @@ class WorkerExtension(GraphExtension):
         # ----- generic fallback -----
         expr_nid = self._add_node(tag, "Expr")
         self._link(parent_nid, expr_nid, "has_arg")
-        for child in elem:
-            if child.tag is etree.Comment:
-                continue
+        for child in _iter_children(elem):
             child_nid = self._walk_expression(child, expr_nid)
             if child_nid:
                 self._link(expr_nid, child_nid, "contains")
@@ -297,13 +305,13 @@ class WorkerExtension(GraphExtension):
 
         if base_elem is not None:
             # New format with explicit <base> element
-            base_children = [c for c in base_elem if c.tag is not etree.Comment]
-            if not base_children:
+            base_child = _first_child(base_elem)
+            if base_child is None:
                 return None
 
             # Create a temporary parent if none provided
             temp_parent = parent_nid if parent_nid else self._new_id("temp")
-            base_nid = self._walk_expression(base_children[0], temp_parent)
+            base_nid = self._walk_expression(base_child, temp_parent)
             if not base_nid:
                 return None
 
@@ -352,7 +360,7 @@ class WorkerExtension(GraphExtension):
                             kw_value = kwarg.get("value")
 
                             # Check if kwarg has child elements (list, constructor, etc.)
-                            kw_children = [c for c in kwarg if c.tag is not etree.Comment]
+                            kw_children = list(_iter_children(kwarg))
                             if kw_children:
                                 # Handle complex kwargs
                                 kw_nid = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
@@ -486,7 +494,7 @@ class ExternalFunctionExtension(GraphExtension):
                     kw_value = kw.get("value")
                     
                     # Check if kwarg has child elements (list, etc.)
-                    kw_children = [c for c in kw if c.tag is not etree.Comment]
+                    kw_children = list(_iter_children(kw))
                     if kw_children:
                         # Handle complex kwargs like lists
                         kw_nid = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
@@ -546,9 +554,7 @@ class CoreFunctionExtension(GraphExtension):
         # Process body
         body = elem.find("body")
         if body is not None:
-            for stmt in body:
-                if stmt.tag is etree.Comment:
-                    continue
+            for stmt in _iter_children(body):
                 self._process_body_statement(stmt, func_nid)
         
         return func_nid
@@ -599,9 +605,8 @@ class CoreFunctionExtension(GraphExtension):
                 # Process arguments
                 for arg in function:
                     if arg.tag == "arg":
-                        arg_children = [c for c in arg if c.tag is not etree.Comment]
-                        if arg_children:
-                            arg_child = arg_children[0]
+                        arg_child = _first_child(arg)
+                        if arg_child is not None:
                             if arg_child.tag == "var":
                                 var_ref = arg_child.get("ref") or (arg_child.text or "").strip()
                                 if var_ref:
@@ -620,9 +625,8 @@ class CoreFunctionExtension(GraphExtension):
             self._link(parent_nid, for_nid, "contains")
 
             # Process nested body statements inside the For loop
-            for child in elem:
-                if child.tag is not etree.Comment:
-                    self._process_body_statement(child, for_nid)
+            for child in _iter_children(elem):
+                self._process_body_statement(child, for_nid)
 
         elif tag == "Assignment":
             # <Assignment target="elem_out" index="i" value="0"/>
@@ -657,9 +661,8 @@ class CoreFunctionExtension(GraphExtension):
             # Process method arguments (e.g., acquire(1), release(1))
             for arg in method:
                 if arg.tag == "arg":
-                    arg_children = [c for c in arg if c.tag is not etree.Comment]
-                    if arg_children:
-                        arg_child = arg_children[0]
+                    arg_child = _first_child(arg)
+                    if arg_child is not None:
                         if arg_child.tag == "const":
                             const_val = arg_child.text.strip() if arg_child.text else "0"
                             const_nid = self._add_node(const_val, "ConstExpr", value=const_val)
@@ -688,9 +691,8 @@ class CoreFunctionExtension(GraphExtension):
             for arg in function:
                 if arg.tag == "arg":
                     # Get first child of arg
-                    arg_children = [c for c in arg if c.tag is not etree.Comment]
-                    if arg_children:
-                        arg_child = arg_children[0]
+                    arg_child = _first_child(arg)
+                    if arg_child is not None:
                         if arg_child.tag == "var":
                             var_ref = arg_child.get("ref") or (arg_child.text or "").strip()
                             if var_ref:
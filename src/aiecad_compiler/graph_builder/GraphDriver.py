@@ -14,9 +14,12 @@ Architecture:
 - Type System: Captures type definitions and relationships
 """
 
+import re
 import sys
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List
 import networkx as nx
 from lxml import etree
 from extension.GraphExtender import register_extensions
@@ -24,9 +27,67 @@ from extension.GraphExtender import register_extensions
 # ----------------------------------------------------------------------
 # Type Definitions
 # ----------------------------------------------------------------------
-NodeId = str  # Unique identifier for graph nodes
+NodeId = int  # Unique identifier for graph nodes (named "<kind>_<n>" in the graph)
 Graph = nx.DiGraph  # Directed graph structure
 
+
+@dataclass(slots=True)
+class _PendingNode:
+    """Compact record for a node not yet committed to the graph."""
+    label: str
+    kind: str
+    attrs: dict | None = None  # Extra attributes, None values already dropped
+
+    def to_attrs(self) -> dict:
+        """Flatten into the node attribute dict stored in the graph."""
+        data = {"label": self.label, "kind": self.kind}
+        if self.attrs:
+            data.update(self.attrs)
+        return data
+
+
+@dataclass(slots=True)
+class _DeferredKwarg:
+    """Expression work-stack entry for a KwargExpr whose value is built first."""
+    parent: NodeId
+    name: str | None
+    slot: list  # Receives the value node once it has been walked
+
+
+def _iter_children(e: etree.Element):
+    """Iterate child elements, skipping comments (filtered inside lxml)."""
+    return e.iterchildren(tag=etree.Element)
+
+
+def _find_child(e: etree.Element, tag: str) -> etree.Element | None:
+    """Equivalent of e.find(tag) for a plain child tag, without ElementPath."""
+    return next(e.iterchildren(tag), None)
+
+
+def _first_child(e: etree.Element) -> etree.Element | None:
+    """First child element (comments skipped), or None; stops at the first match."""
+    return next(e.iterchildren(tag=etree.Element), None)
+
+
+# TensorTiler2D attributes and the value used when the XML omits them
+_TILER2D_DEFAULTS = (
+    ("tensor_dims", ""),
+    ("tile_dims", ""),
+    ("tile_counts", ""),
+    ("prune_step", "False"),
+    ("index", "0"),
+)
+
+# Marks a declaration that shadowed nothing (see GraphBuilder._declare_symbol)
+_UNBOUND = object()
+
+# Interned labels for the operators expressions use most
+_BINARY_OP_LABELS = {op: sys.intern(f"binary_op({op})")
+                     for op in ("+", "-", "*", "/", "//", "%", "&", "|", "^", "<<", ">>")}
+_COMPARISON_LABELS = {op: sys.intern(f"comparison({op})")
+                      for op in ("==", "!=", "<", ">", "<=", ">=")}
+
+
 # ----------------------------------------------------------------------
 # GraphBuilder Class - Main XML to Graph Converter
 # ----------------------------------------------------------------------
@@ -49,9 +110,36 @@ class GraphBuilder:
     def __init__(self, xml_path: Path):
         self.xml_path = xml_path
         self.graph: Graph = nx.DiGraph()
+        self.kind_counts: Counter = Counter()  # Node kind → count ("?" for implicit nodes)
         self._counter = 0  # Unique ID generator
+        self._id_prefixes: Dict[NodeId, str] = {}  # Prefixes of ids issued by _new_id
+        self._node_names: Dict[NodeId, str] = {}  # nid → graph node name, for committed nodes
+        self._kind_prefix_cache: Dict[str, str] = {}  # kind → interned "<kind>_" prefix
+        # Nodes/edges are batched and flushed into the graph in bulk
+        self._pending_nodes: Dict[NodeId, _PendingNode | None] = {}  # insertion ordered; None = implicit
+        self._pending_edges: List[tuple] = []  # (src, dst, edge_type) — compact until flushed
         self._symbol_table: Dict[str, NodeId] = {}  # Global scope
         self._scope_stack: List[Dict[str, NodeId]] = [self._symbol_table]  # Nested scopes
+        # Innermost binding of every visible name, plus per scope the binding
+        # each of its declarations shadowed (restored when the scope is popped)
+        self._active_symbols: Dict[str, NodeId] = {}
+        self._shadow_stack: List[Dict[str, object]] = [{}]
+
+        # Tag → handler dispatch for kwarg child elements
+        self._kwc_dispatch = {
+            "constructor": self._kwc_constructor,
+            "list": self._kwc_list,
+            "const": self._kwc_const,
+            "string": self._kwc_string,
+            "var": self._kwc_var,
+            "method": self._kwc_method,
+            "binary_op": self._process_binary_op,
+        }
+        # Tag → handler caches, filled on first use of each tag (so each
+        # distinct tag is lowercased and resolved with getattr only once)
+        self._func_dispatch: Dict[str, Callable] = {}
+        self._symbol_dispatch: Dict[str, Callable | None] = {}
+        self._df_dispatch: Dict[str, Callable | None] = {}
 
         #Bring in GraphExtender extensions 
         register_extensions(self)
@@ -66,7 +154,8 @@ class GraphBuilder:
     def _new_id(self, prefix: str = "node") -> NodeId:
         """Generate unique node identifier with semantic prefix."""
         self._counter += 1
-        return f"{prefix}_{self._counter}"
+        self._id_prefixes[self._counter] = prefix
+        return self._counter
 
     def _add_node(self, label: str, kind: str, **attrs) -> NodeId:
         """
@@ -80,9 +169,16 @@ class GraphBuilder:
         Returns:
             NodeId: Unique identifier for the created node
         """
-        clean_attrs = {k: v for k, v in attrs.items() if v is not None}
-        nid = self._new_id(kind)
-        self.graph.add_node(nid, label=label, kind=kind, **clean_attrs)
+        # Inlined _new_id(kind): this is the hottest call in graph building.
+        # The "<kind>_<n>" name is only formatted when the node is committed.
+        self._counter += 1
+        nid = self._counter
+        self.kind_counts[kind] += 1
+        if attrs:
+            clean_attrs = {k: v for k, v in attrs.items() if v is not None}
+            self._pending_nodes[nid] = _PendingNode(label, kind, clean_attrs)
+        else:
+            self._pending_nodes[nid] = _PendingNode(label, kind)
         return nid
 
     def _link(self, src: NodeId, dst: NodeId, edge_type: str = "depends_on"):
@@ -99,7 +195,51 @@ class GraphBuilder:
         - 'then'/'else': Branch statements
         """
         if src and dst and edge_type:
-            self.graph.add_edge(src, dst, type=edge_type)
+            # Endpoints not created via _add_node are added implicitly, in the
+            # same order nx.DiGraph.add_edge would have inserted them
+            pending = self._pending_nodes
+            for n in (src, dst):
+                if n not in pending and n not in self._node_names:
+                    pending[n] = None
+            self._pending_edges.append((src, dst, edge_type))
+
+    def _flush_pending(self):
+        """
+        Commit batched nodes and edges to the graph.
+        
+        Integer ids are translated to their "<kind>_<n>" node names here, so
+        self.graph is always keyed by name. Must be called before reading or
+        mutating self.graph directly (use _node_names to translate ids).
+        """
+        names = self._node_names
+        if self._pending_nodes:
+            prefixes = self._id_prefixes
+            prefix_cache = self._kind_prefix_cache
+            batch = []
+            for nid, rec in self._pending_nodes.items():
+                if rec is None:
+                    # Implicit nodes (linked but never added) carry no kind
+                    kind = prefixes[nid]
+                    data = {}
+                    self.kind_counts["?"] += 1
+                else:
+                    kind = rec.kind
+                    data = rec.to_attrs()
+                prefix = prefix_cache.get(kind)
+                if prefix is None:
+                    prefix = prefix_cache[kind] = sys.intern(kind + "_")
+                name = prefix + str(nid)
+                names[nid] = name
+                batch.append((name, data))
+            self.graph.add_nodes_from(batch)
+            self._pending_nodes.clear()
+        if self._pending_edges:
+            # Edge types come from a small fixed vocabulary: share one
+            # attribute dict per type (add_edges_from copies it into each edge)
+            type_attrs = {t: {"type": t} for t in {edge[2] for edge in self._pending_edges}}
+            self.graph.add_edges_from((names[src], names[dst], type_attrs[edge_type])
+                                      for src, dst, edge_type in self._pending_edges)
+            self._pending_edges.clear()
 
     # ===================================================================
     # SECTION 2: Symbol Table and Scope Management
@@ -108,6 +248,26 @@ class GraphBuilder:
     # Supports nested scopes (functions, loops, blocks) with proper shadowing.
     # Critical for linking variable references to their declarations.
     
+    def _push_scope(self):
+        """Open a new nested scope (function body, loop, block)."""
+        self._scope_stack.append({})
+        self._shadow_stack.append({})
+
+    def _pop_scope(self):
+        """
+        Close the innermost scope.
+        
+        Names it declared revert to the outer binding they shadowed, or
+        disappear from the active view if there was none.
+        """
+        self._scope_stack.pop()
+        active = self._active_symbols
+        for name, prior in self._shadow_stack.pop().items():
+            if prior is _UNBOUND:
+                del active[name]
+            else:
+                active[name] = prior
+
     def _declare_symbol(self, name: str, nid: NodeId):
         """
         Register a symbol (variable, function, type) in current scope.
@@ -119,30 +279,33 @@ class GraphBuilder:
         """
         if name is None:
             return
-        # Check if symbol exists in outer scopes (shadowing)
-        for scope in reversed(self._scope_stack[:-1]):
-            if name in scope:
-                self._scope_stack[-1][name] = nid
+        scope = self._scope_stack[-1]
+        shadowed = self._shadow_stack[-1]
+        if name in scope:
+            # Prevent duplicate in current scope, unless the name shadows
+            # an outer scope symbol (then the latest declaration wins)
+            if shadowed[name] is _UNBOUND:
                 return
-        # Prevent duplicate in current scope
-        if name in self._scope_stack[-1]:
-            return
-        # Register new symbol
-        self._scope_stack[-1][name] = nid
+        else:
+            shadowed[name] = self._active_symbols.get(name, _UNBOUND)
+        # Register symbol
+        scope[name] = nid
+        self._active_symbols[name] = nid
 
     def _lookup(self, name: str) -> NodeId:
         """
         Resolve symbol name to its node ID.
         
-        Searches scopes from innermost to outermost (lexical scoping).
+        Lexical scoping (innermost to outermost) is already resolved in
+        the active symbol view, so this is a single dict lookup.
         Raises NameError if symbol not found.
         """
         if not name:
             raise NameError("Empty name in lookup")
-        for scope in reversed(self._scope_stack):
-            if name in scope:
-                return scope[name]
-        raise NameError(f"Undefined symbol: {name}")
+        nid = self._active_symbols.get(name)
+        if nid is None:
+            raise NameError(f"Undefined symbol: {name}")
+        return nid
 
     # ===================================================================
     # SECTION 3: Main Build Process
@@ -150,7 +313,7 @@ class GraphBuilder:
     # Entry point for XML to graph conversion.
     # Validates XML structure and dispatches to section-specific handlers.
     
-    def build(self) -> Graph:
+    def build(self, root: etree.Element | None = None) -> Graph:
         """
         Parse XML and build complete semantic graph.
         
@@ -160,28 +323,61 @@ class GraphBuilder:
         3. Dispatch to section handlers (Symbols, DataFlow, Function, etc.)
         4. Return complete graph
         
+        When reading xml_path, the file is streamed with iterparse: each
+        top-level section is handled as soon as it is fully parsed and then
+        discarded, so only one section is held in memory at a time.
+        
+        Args:
+            root: Optional in-memory <Module> element (e.g. the output of
+                  XMLTransformer.transform() in the same process). When given,
+                  xml_path is not re-parsed.
+        
         Returns:
             Graph: NetworkX DiGraph with all code elements and relationships
         """
-        tree = etree.parse(str(self.xml_path))
-        root = tree.getroot()
+        if root is not None:
+            module_nid = self._begin_module(root)
+            # Process each top-level section
+            for section in _iter_children(root):
+                self._process_section(section, module_nid)
+        else:
+            module_nid = None
+            depth = 0
+            for event, el in etree.iterparse(str(self.xml_path), events=("start", "end")):
+                if event == "start":
+                    if depth == 0:
+                        module_nid = self._begin_module(el)
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 1:
+                    # A complete top-level section: process, then free it
+                    # along with any earlier siblings (comments)
+                    self._process_section(el, module_nid)
+                    el.clear(keep_tail=True)
+                    parent = el.getparent()
+                    while el.getprevious() is not None:
+                        del parent[0]
+        self._flush_pending()
+        return self.graph
+
+    def _begin_module(self, root: etree.Element) -> NodeId:
+        """Validate the <Module> root and create its Module node."""
         if root.tag != "Module":
             raise ValueError("Root must be <Module>")
 
         module_name = root.get("name", "unnamed")
         module_nid = self._add_node(module_name, "Module")
         self._declare_symbol(module_name, module_nid)
+        return module_nid
 
-        # Process each top-level section
-        for section in root:
-            if section.tag is etree.Comment:
-                continue
-            tag = str(section.tag)
-            # Dynamic dispatch to section handler
-            handler = getattr(self, f"_process_{tag.lower()}", None)
-            if handler:
-                handler(section, module_nid)
-        return self.graph
+    def _process_section(self, section: etree.Element, module_nid: NodeId):
+        """Dispatch a top-level section to its _process_<tag> handler."""
+        tag = section.tag
+        # Dynamic dispatch to section handler
+        handler = getattr(self, f"_process_{tag.lower()}", None)
+        if handler:
+            handler(section, module_nid)
 
     # ===================================================================
     # SECTION 4: Symbols Section Processing
@@ -200,19 +396,21 @@ class GraphBuilder:
         """
         sec = self._add_node("Symbols", "Section")
         self._link(parent_nid, sec, "contains")
-        for child in elem:
-            if child.tag is etree.Comment:
-                continue
-            tag = str(child.tag)
+        dispatch = self._symbol_dispatch
+        for child in _iter_children(elem):
+            tag = child.tag
             # Dispatch to symbol-specific handler
-            h = getattr(self, f"_symbol_{tag.lower()}", None)
+            if tag in dispatch:
+                h = dispatch[tag]
+            else:
+                h = dispatch[tag] = getattr(self, f"_symbol_{tag.lower()}", None)
             if h:
                 h(child, sec)
 
     def _symbol_const(self, e: etree.Element, p: NodeId):
         """Create Const node for constant declarations (e.g., N = 4096)."""
         name = e.get("name")
-        value = e.text.strip() if e.text else "?"
+        value = (e.text or "?").strip()
         n = self._add_node(name, "Const", value=value)
         self._link(p, n, "contains")
         self._declare_symbol(name, n)
@@ -232,31 +430,38 @@ class GraphBuilder:
 
     def _walk_type_def(self, e: etree.Element, p: NodeId):
         """
-        Recursively walk type definition structure.
-        
+        Walk type definition structure.
+
         Handles:
         - ndarray: Array type container
         - shape: Tuple of dimensions
         - dtype: Data type specification
         - expr: Dimension expressions (e.g., N, N*2)
+
+        Nesting is followed with an explicit stack of child iterators, so
+        nodes are still created in document (depth-first) order.
         """
-        for c in e:
-            if c.tag is etree.Comment:
+        stack = [(_iter_children(e), p)]
+        while stack:
+            children, p = stack[-1]
+            c = next(children, None)
+            if c is None:
+                stack.pop()
                 continue
-            t = str(c.tag)
+            t = c.tag
             if t in ("ndarray", "shape", "tuple", "dtype"):
                 nd = self._add_node(t, "TypeNode")
                 self._link(p, nd, "has")
-                self._walk_type_def(c, nd)
+                stack.append((_iter_children(c), nd))
             elif t == "expr":
                 # Check if expr has child elements (method, var, binary_op, etc.)
-                expr_children = [child for child in c if child.tag is not etree.Comment]
-                if expr_children:
+                expr_child = _first_child(c)
+                if expr_child is not None:
                     # Create Expr node and process children
                     nd = self._add_node("", "Expr")
                     self._link(p, nd, "contains")
                     # Process the first child as the expression content
-                    child_node = self._walk_expression(expr_children[0], nd)
+                    child_node = self._walk_expression(expr_child, nd)
                     if child_node:
                         self._link(nd, child_node, "contains")
                 else:
@@ -265,14 +470,15 @@ class GraphBuilder:
                     nd = self._add_node(txt.strip(), "Expr")
                     self._link(p, nd, "contains")
             elif t == "numpy_dtype":
-                txt = c.text.strip() if c.text else "unknown"
+                txt = (c.text or "unknown").strip()
                 nd = self._add_node(txt, "NumpyDtype")
                 self._link(p, nd, "is")
 
     def _symbol_import(self, e: etree.Element, p: NodeId):
         """Create Import node for module imports (e.g., import numpy as np)."""
-        name = e.get("name")
-        alias = e.get("alias")
+        a = e.attrib
+        name = a.get("name")
+        alias = a.get("alias")
         n = self._add_node(name, "Import", alias=alias)
         self._link(p, n, "contains")
         self._declare_symbol(name, n)
@@ -284,14 +490,13 @@ class GraphBuilder:
         Example: a_tap = TensorTiler2D.group_tiler(tensor_dims, tile_dims, tile_counts,
                              prune_step=False)[0]
         """
-        name = e.get("name")
-        n = self._add_node(name, "TensorTiler2D",
-                           tensor_dims=e.get("tensor_dims", ""),
-                           tile_dims=e.get("tile_dims", ""),
-                           tile_counts=e.get("tile_counts", ""),
-                           prune_step=e.get("prune_step", "False"),
-                           index=e.get("index", "0"),
-                           pattern_repeat=e.get("pattern_repeat"))
+        a = e.attrib
+        name = a.get("name")
+        attrs = {k: a.get(k, default) for k, default in _TILER2D_DEFAULTS}
+        # pattern_repeat has no default; only pass it when present
+        if "pattern_repeat" in a:
+            attrs["pattern_repeat"] = a["pattern_repeat"]
+        n = self._add_node(name, "TensorTiler2D", **attrs)
         self._link(p, n, "contains")
         self._declare_symbol(name, n)
 
@@ -301,12 +506,13 @@ class GraphBuilder:
 
         Example: my_tap = TensorAccessPattern((rows, cols), offset=0, sizes=[...], strides=[...])
         """
-        name = e.get("name")
+        a = e.attrib
+        name = a.get("name")
         n = self._add_node(name, "TensorAccessPattern",
-                           tensor_dims=e.get("tensor_dims", ""),
-                           offset=e.get("offset", "0"),
-                           sizes=e.get("sizes", ""),
-                           strides=e.get("strides", ""))
+                           tensor_dims=a.get("tensor_dims", ""),
+                           offset=a.get("offset", "0"),
+                           sizes=a.get("sizes", ""),
+                           strides=a.get("strides", ""))
         self._link(p, n, "contains")
         self._declare_symbol(name, n)
 
@@ -330,19 +536,18 @@ class GraphBuilder:
         """
         sec = self._add_node("DataFlow", "Section")
         self._link(parent_nid, sec, "contains")
-        for c in elem:
-            if c.tag is etree.Comment:
-                continue
-            t = str(c.tag)
-            # First try dataflow-specific handler
-            h = getattr(self, f"_df_{t.lower()}", None)
+        dispatch = self._df_dispatch
+        for c in _iter_children(elem):
+            t = c.tag
+            if t in dispatch:
+                h = dispatch[t]
+            else:
+                # First try dataflow-specific handler, then extension handler
+                name = t.lower()
+                h = dispatch[t] = (getattr(self, f"_df_{name}", None)
+                                   or getattr(self, f"_process_ext_{name}", None))
             if h:
                 h(c, sec)
-            else:
-                # Try extension handler
-                ext_h = getattr(self, f"_process_ext_{t.lower()}", None)
-                if ext_h:
-                    ext_h(c, sec)
 
     def _df_objectfifo(self, e: etree.Element, p: NodeId):
         """
@@ -362,7 +567,7 @@ class GraphBuilder:
         for sub in e:
             if sub.tag == "obj_type":
                 # Link to type definition
-                type_ref_elem = sub.find("type_ref")
+                type_ref_elem = _find_child(sub, "type_ref")
                 if type_ref_elem is not None and type_ref_elem.text:
                     ref = type_ref_elem.text.strip()
                     try:
@@ -383,12 +588,15 @@ class GraphBuilder:
                 # Capture keyword arguments
                 for kw in sub:
                     if kw.tag == "kwarg":
-                        kw_n = self._add_node(f"{kw.get('name')}={kw.get('value')}", "Kwarg",
-                                            name=kw.get("name"), value=kw.get("value"))
+                        a = kw.attrib
+                        kw_name = a.get("name")
+                        kw_value = a.get("value")
+                        kw_n = self._add_node(f"{kw_name}={kw_value}", "Kwarg",
+                                            name=kw_name, value=kw_value)
                         self._link(n, kw_n, "has_kwarg")
             elif sub.tag == "source":
                 # Handle method chains for derived fifos
-                method_chain = sub.find("method_chain")
+                method_chain = _find_child(sub, "method_chain")
                 if method_chain is not None:
                     # Try to use extension handler if available (for kwargs support)
                     ext_handler = getattr(self, '_process_ext_worker', None)
@@ -403,7 +611,7 @@ class GraphBuilder:
                         self._link(n, chain_expr, "source_expr")
                 else:
                     # Fallback to old call format
-                    source_call = sub.find("call")
+                    source_call = _find_child(sub, "call")
                     if source_call is not None:
                         source_expr = self._walk_call_chain(source_call, n)
                         self._link(n, source_expr, "source_expr")
@@ -425,7 +633,7 @@ class GraphBuilder:
             self._link(n, ctx_n, "context")
 
         # Bindings
-        binds = e.find("bindings")
+        binds = _find_child(e, "bindings")
         if binds is not None:
             for b in binds:
                 if b.tag == "bind":
@@ -434,7 +642,7 @@ class GraphBuilder:
                     self._declare_symbol(b.get("name"), bn)
 
         # Body: fill/drain
-        body = e.find("body")
+        body = _find_child(e, "body")
         if body is not None:
             for op in body:
                 if op.tag == "Operation":
@@ -461,28 +669,29 @@ class GraphBuilder:
                 self._link(op, method_node, "target")
 
         # Args - handle new structure with <arg> elements
-        args = e.find("args")
+        args = _find_child(e, "args")
         if args is not None:
             for arg in args:
-                arg_tag = str(arg.tag)
+                arg_tag = arg.tag
                 if arg_tag == "arg":
                     # Process the argument content
-                    call_elem = arg.find("call")
-                    var_elem = arg.find("var")
+                    call_elem = _find_child(arg, "call")
                     if call_elem is not None:
                         arg_n = self._walk_call_chain(call_elem, op)
                         self._link(op, arg_n, "has_arg")
-                    elif var_elem is not None:
-                        var_ref = var_elem.get("ref")
-                        if var_ref:
-                            try:
-                                var_node = self._lookup(var_ref)
-                                self._link(op, var_node, "has_arg")
-                            except NameError:
-                                var_node = self._add_node(var_ref, "VarRef")
+                    else:
+                        # Only a named <var> is an operation argument
+                        var_elem = _find_child(arg, "var")
+                        if var_elem is not None:
+                            var_ref = var_elem.get("ref")
+                            if var_ref:
+                                try:
+                                    var_node = self._lookup(var_ref)
+                                except NameError:
+                                    var_node = self._add_node(var_ref, "VarRef")
                                 self._link(op, var_node, "has_arg")
                 elif arg_tag in ("producer", "consumer", "input", "output"):
-                    chain = arg.find("call")
+                    chain = _find_child(arg, "call")
                     if chain is not None:
                         chain_n = self._walk_call_chain(chain, op)
                         self._link(op, chain_n, arg_tag)
@@ -491,7 +700,7 @@ class GraphBuilder:
                     kw_value = arg.get("value")
 
                     # Check for child elements (constructor, list, var, method, etc.)
-                    kw_children = [c for c in arg if c.tag is not etree.Comment]
+                    kw_children = list(_iter_children(arg))
 
                     if kw_children:
                         # Check for var + method pattern (e.g., <var ref="obj"/>.<method name="prod"/>)
@@ -528,108 +737,115 @@ class GraphBuilder:
                         self._link(op, kw_n, "has_kwarg")
 
     def _process_kwarg_child(self, elem: etree.Element, parent_nid: NodeId) -> NodeId | None:
-        """Process child elements within kwargs (constructor, list, var, method, etc.)"""
-        tag = elem.tag
-
-        if tag == "constructor":
-            # Handle <constructor ref="Tile">...</constructor>
-            ref = elem.get("ref")
-            ctor_nid = self._add_node(ref, "Constructor")
-
-            # Process constructor arguments
-            for arg in elem.findall("arg"):
-                arg_children = [c for c in arg if c.tag is not etree.Comment]
-                for child in arg_children:
-                    if child.tag == "const":
-                        const_val = child.text
-                        const_nid = self._add_node(const_val, "ConstExpr", value=const_val)
-                        self._link(ctor_nid, const_nid, "has_arg")
-                    elif child.tag == "var":
-                        var_ref = child.get("ref")
-                        try:
-                            var_node = self._lookup(var_ref)
-                            self._link(ctor_nid, var_node, "has_arg")
-                        except NameError:
-                            var_node = self._add_node(var_ref, "VarRef")
-                            self._link(ctor_nid, var_node, "has_arg")
-
-            # Process constructor kwargs
-            for kwarg in elem.findall("kwarg"):
-                kw_name = kwarg.get("name")
-                kw_children = [c for c in kwarg if c.tag is not etree.Comment]
-                if kw_children:
-                    kw_nid = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
-                    self._link(ctor_nid, kw_nid, "has_kwarg")
-                    for child in kw_children:
-                        child_node = self._process_kwarg_child(child, kw_nid)
-                        if child_node:
-                            self._link(kw_nid, child_node, "contains")
-
-            return ctor_nid
-
-        elif tag == "list":
-            # Handle <list>...</list>
-            list_nid = self._add_node("list", "List")
-            for item in elem:
-                if item.tag == "const":
-                    const_val = item.text
-                    const_nid = self._add_node(const_val, "ConstExpr", value=const_val)
-                    self._link(list_nid, const_nid, "contains")
-                elif item.tag == "method":
-                    method_name = item.get("name")
-                    method_ref = item.get("ref")
-                    method_nid = self._add_node(method_name, "MethodCall", object_ref=method_ref)
-                    self._link(list_nid, method_nid, "contains")
-                elif item.tag == "binary_op":
-                    binop_nid = self._process_binary_op(item, list_nid)
-                    if binop_nid:
-                        self._link(list_nid, binop_nid, "contains")
-            return list_nid
-
-        elif tag == "const":
-            # Handle <const>value</const>
-            const_val = elem.text
-            return self._add_node(const_val, "ConstExpr", value=const_val)
-
-        elif tag == "string":
-            # Handle <string>"value"</string> or <string>value</string>
-            string_val = elem.text
-            return self._add_node(string_val, "String", value=string_val)
-
-        elif tag == "var":
-            # Handle <var ref="..."/>
-            var_ref = elem.get("ref")
-            try:
-                return self._lookup(var_ref)
-            except NameError:
-                return self._add_node(var_ref, "VarRef")
+        """
+        Process child elements within kwargs (constructor, list, var, method, etc.)
 
-        elif tag == "method":
-            # Handle <method ref="..." name="..."/>
-            method_name = elem.get("name")
-            method_ref = elem.get("ref")
-            return self._add_node(method_name, "MethodCall", object_ref=method_ref)
+        Handlers do not recurse: nested elements are pushed onto a work
+        stack as (handler, elem, owner, edge_type) entries, in reverse so
+        they pop in document order, and linked to their owner once built.
+        """
+        h = self._kwc_dispatch.get(elem.tag)
+        if h is None:
+            return None
+        stack = []
+        nid = h(elem, parent_nid, stack)
+        self._drain_kwarg_stack(stack)
+        return nid
 
-        elif tag == "binary_op":
-            return self._process_binary_op(elem, parent_nid)
+    def _process_arg_children(self, arg_elem: etree.Element, parent_nid: NodeId, stack: list):
+        """
+        Queue the <const>/<var> children of a constructor's <arg> onto the
+        kwarg work stack, to be linked to parent_nid as has_arg edges.
+        Other argument forms are not part of a constructor node.
+        """
+        children = [c for c in _iter_children(arg_elem) if c.tag in ("const", "var")]
+        self._push_kwarg_children(stack, children, parent_nid, "has_arg")
+
+    def _drain_kwarg_stack(self, stack: list):
+        """Build queued kwarg children until the work stack is empty."""
+        while stack:
+            h, child, owner, edge_type = stack.pop()
+            child_nid = h(child, owner, stack)
+            if child_nid:
+                self._link(owner, child_nid, edge_type)
+
+    def _push_kwarg_children(self, stack: list, children, owner: NodeId, edge_type: str):
+        """Queue kwarg child elements for _process_kwarg_child, first child on top."""
+        dispatch = self._kwc_dispatch
+        for child in reversed(children):
+            h = dispatch.get(child.tag)
+            if h is not None:
+                stack.append((h, child, owner, edge_type))
+
+    def _kwc_constructor(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <constructor ref="Tile">...</constructor>"""
+        ref = elem.get("ref")
+        ctor_nid = self._add_node(ref, "Constructor")
+
+        # Queue kwargs first so the arguments above them are built first;
+        # each Kwarg node is created when popped
+        for kwarg in reversed(elem.findall("kwarg")):
+            stack.append((self._kwc_ctor_kwarg, kwarg, ctor_nid, "has_kwarg"))
+
+        # Constructor arguments
+        for arg in reversed(elem.findall("arg")):
+            self._process_arg_children(arg, ctor_nid, stack)
+
+        return ctor_nid
+
+    def _kwc_ctor_kwarg(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId | None:
+        """Handle a constructor's <kwarg name="...">...</kwarg>"""
+        kw_children = list(_iter_children(elem))
+        if not kw_children:
+            return None
+        kw_name = elem.get("name")
+        kw_nid = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
+        self._push_kwarg_children(stack, kw_children, kw_nid, "contains")
+        return kw_nid
+
+    def _kwc_list(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <list>...</list>"""
+        list_nid = self._add_node("list", "List")
+        # Only const, method and binary_op items are list members
+        items = [item for item in elem if item.tag in ("const", "method", "binary_op")]
+        self._push_kwarg_children(stack, items, list_nid, "contains")
+        return list_nid
+
+    def _kwc_const(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <const>value</const>"""
+        const_val = elem.text
+        return self._add_node(const_val, "ConstExpr", value=const_val)
+
+    def _kwc_string(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <string>"value"</string> or <string>value</string>"""
+        string_val = elem.text
+        return self._add_node(string_val, "String", value=string_val)
+
+    def _kwc_var(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <var ref="..."/>"""
+        var_ref = elem.get("ref")
+        try:
+            return self._lookup(var_ref)
+        except NameError:
+            return self._add_node(var_ref, "VarRef")
 
-        return None
+    def _kwc_method(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId:
+        """Handle <method ref="..." name="..."/>"""
+        method_name = elem.get("name")
+        method_ref = elem.get("ref")
+        return self._add_node(method_name, "MethodCall", object_ref=method_ref)
 
-    def _process_binary_op(self, elem: etree.Element, parent_nid: NodeId) -> NodeId | None:
+    def _process_binary_op(self, elem: etree.Element, parent_nid: NodeId, stack: list) -> NodeId | None:
         """Process binary operation elements"""
-        op = elem.get("op", "+")
-        binop_nid = self._add_node(f"{op}", "BinaryOp", op=op)
+        op = elem.attrib.get("op", "+")
+        binop_nid = self._add_node(op, "BinaryOp", op=op)
 
-        # Process operands
-        children = [c for c in elem if c.tag is not etree.Comment]
-        if len(children) >= 1:
-            left_nid = self._process_kwarg_child(children[0], binop_nid)
-            if left_nid:
-                self._link(binop_nid, left_nid, "lhs")
+        # Process operands (rhs pushed first so lhs is built first)
+        children = list(_iter_children(elem))
         if len(children) >= 2:
-            right_nid = self._process_kwarg_child(children[1], binop_nid)
-            if right_nid:
-                self._link(binop_nid, right_nid, "rhs")
+            self._push_kwarg_children(stack, children[1:2], binop_nid, "rhs")
+        if len(children) >= 1:
+            self._push_kwarg_children(stack, children[:1], binop_nid, "lhs")
 
         return binop_nid
 
@@ -669,7 +885,8 @@ class GraphBuilder:
         Process method chains like of_in.cons().forward().
         
         Creates linked Call nodes with 'nested_call' edges to preserve order.
-        Uses temporary parent to avoid polluting graph structure.
+        Calls are walked without a parent so the caller decides how the
+        chain attaches to the graph.
         
         Returns:
             NodeId: First call in the chain (entry point for traversal)
@@ -678,25 +895,19 @@ class GraphBuilder:
         if not calls:
             return None
         
-        # Create temporary parent to avoid linking to wrong parent
-        chain_parent = self._add_node("method_chain_temp", "TempNode")
-        
         # Process first call
-        first_call = self._walk_call_chain(calls[0], chain_parent)
+        first_call = self._walk_call_chain(calls[0], None)
         prev_call = first_call
         
         # Chain subsequent calls with nested_call edges
         for call_elem in calls[1:]:
-            next_call = self._walk_call_chain(call_elem, chain_parent)
+            next_call = self._walk_call_chain(call_elem, None)
             self._link(prev_call, next_call, "nested_call")
             prev_call = next_call
         
-        # Clean up temporary node
-        self.graph.remove_node(chain_parent)
-        
         return first_call
     
-    def _walk_call_chain(self, e: etree.Element, p: NodeId) -> NodeId:
+    def _walk_call_chain(self, e: etree.Element, p: NodeId | None) -> NodeId:
         """
         Process a single call (method or function) with arguments.
         
@@ -706,100 +917,100 @@ class GraphBuilder:
         - Arguments: positional and keyword
         - Nested expressions in arguments
         
+        A parent of None leaves the Call node unattached (used by method chains).
+        
         Returns:
             NodeId: Call node with all arguments and kwargs linked
         """
-        call = self._add_node("call", "Call")
-        self._link(p, call, "contains")
-
-        # Find method
-        method = e.find("method")
+        add_node = self._add_node
+        link = self._link
+        walk = self._walk_expression
+        call = add_node("call", "Call")
+        if p is not None:
+            link(p, call, "contains")
+
+        # Sort the children in one pass; they are still processed as
+        # method, function (with its own args), then the call's args
+        method = function = None
+        args = []
+        for child in _iter_children(e):
+            tag = child.tag
+            if tag == "arg" or tag == "kwarg":
+                args.append(child)
+            elif tag == "method":
+                if method is None:
+                    method = child
+            elif tag == "function":
+                if function is None:
+                    function = child
+
+        # Method
         if method is not None:
             obj_ref = method.get("ref")
             method_name = method.get("name")
             if obj_ref and method_name:
                 try:
                     obj_n = self._lookup(obj_ref)
-                    mn = self._add_node(method_name, "MethodCall")
-                    self._link(call, mn, "calls")
-                    self._link(mn, obj_n, "object")
+                    mn = add_node(method_name, "MethodCall")
+                    link(call, mn, "calls")
+                    link(mn, obj_n, "object")
                 except NameError:
                     pass
             elif method_name:
                 # Method without object reference (chained call)
-                mn = self._add_node(method_name, "MethodCall")
-                self._link(call, mn, "calls")
+                mn = add_node(method_name, "MethodCall")
+                link(call, mn, "calls")
 
-        # Find function
-        function = e.find("function")
+        # Function
         if function is not None:
             func_name = function.get("name") or function.get("ref")
             if func_name:
                 chain_suffix = e.get("chain") or None  # e.g. ".reshape(256, 256)"
-                fn = self._add_node(func_name, "FunctionCall", chain_suffix=chain_suffix)
-                self._link(call, fn, "calls")
+                fn = add_node(func_name, "FunctionCall", chain_suffix=chain_suffix)
+                link(call, fn, "calls")
                 
                 # Process arguments that are children of the function element
-                for func_child in function:
-                    if func_child.tag is etree.Comment:
-                        continue
-                    func_child_tag = str(func_child.tag)
+                for func_child in _iter_children(function):
+                    func_child_tag = func_child.tag
                     if func_child_tag == "arg":
                         # Process argument content
-                        arg_content = None
-                        for child in func_child:
-                            if child.tag is not etree.Comment:
-                                arg_content = self._walk_expression(child, call)
-                                break
+                        arg_content = walk(_first_child(func_child), call)
                         if arg_content:
-                            self._link(call, arg_content, "has_arg")
+                            link(call, arg_content, "has_arg")
                     elif func_child_tag == "kwarg":
-                        kw_name = func_child.get("name")
-                        kw_value = func_child.get("value")
-                        kw_children = [c for c in func_child if c.tag is not etree.Comment]
-                        if kw_children:
-                            kw_expr = self._walk_expression(kw_children[0], call)
-                            kw_n = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
-                            if kw_expr:
-                                self._link(kw_n, kw_expr, "contains")
-                            self._link(call, kw_n, "has_kwarg")
-                        else:
-                            kw_n = self._add_node(f"{kw_name}={kw_value}", "Kwarg", name=kw_name, value=kw_value)
-                            self._link(call, kw_n, "has_kwarg")
+                        self._call_kwarg(func_child, call)
 
         # Args
-        for arg in e:
-            arg_tag = str(arg.tag)
-            if arg_tag == "arg":
+        for arg in args:
+            if arg.tag == "arg":
                 # Process argument content
-                arg_content = None
-                for child in arg:
-                    if child.tag is not etree.Comment:
-                        arg_content = self._walk_expression(child, call)
-                        break
+                arg_content = walk(_first_child(arg), call)
                 if arg_content:
-                    self._link(call, arg_content, "has_arg")
+                    link(call, arg_content, "has_arg")
                 else:
-                    arg_n = self._add_node("arg", "Arg")
-                    self._link(call, arg_n, "has_arg")
-            elif arg_tag == "kwarg":
-                kw_name = arg.get("name")
-                kw_value = arg.get("value")
-                # Check if kwarg has child elements
-                kw_children = [c for c in arg if c.tag is not etree.Comment]
-                if kw_children:
-                    kw_expr = self._walk_expression(kw_children[0], call)
-                    kw_n = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
-                    if kw_expr:
-                        self._link(kw_n, kw_expr, "contains")
-                    self._link(call, kw_n, "has_kwarg")
-                else:
-                    kw_n = self._add_node(f"{kw_name}={kw_value}", "Kwarg", name=kw_name, value=kw_value)
-                    self._link(call, kw_n, "has_kwarg")
+                    arg_n = add_node("arg", "Arg")
+                    link(call, arg_n, "has_arg")
+            else:
+                self._call_kwarg(arg, call)
             # Note: We don't process nested call/method here because method_chain handles that
 
         return call
 
+    def _call_kwarg(self, kwarg: etree.Element, call: NodeId):
+        """Attach a <kwarg> of a call (or of its <function>) as a Kwarg node."""
+        kw_name = kwarg.get("name")
+        # Check if kwarg has child elements
+        kw_child = _first_child(kwarg)
+        if kw_child is not None:
+            kw_expr = self._walk_expression(kw_child, call)
+            kw_n = self._add_node(f"{kw_name}=...", "Kwarg", name=kw_name)
+            if kw_expr:
+                self._link(kw_n, kw_expr, "contains")
+        else:
+            kw_value = kwarg.get("value")
+            kw_n = self._add_node(f"{kw_name}={kw_value}", "Kwarg", name=kw_name, value=kw_value)
+        self._link(call, kw_n, "has_kwarg")
+
     # ===================================================================
     # SECTION 7: Function Processing
     # ===================================================================
@@ -819,10 +1030,10 @@ class GraphBuilder:
         name = e.get("name")
         nid = self._add_node(name, "Function", decorator=e.get("decorator"))
         self._link(p, nid, "contains")
-        self._scope_stack.append({})
+        self._push_scope()
         self._declare_symbol(name, nid)
 
-        params = e.find("parameters")
+        params = _find_child(e, "parameters")
         if params is not None:
             for param in params:
                 if param.tag == "param":
@@ -831,21 +1042,24 @@ class GraphBuilder:
                     self._link(nid, p_n, "has_param")
                     self._declare_symbol(p_name, p_n)
 
-        body = e.find("body")
+        body = _find_child(e, "body")
         if body is not None:
             self._process_function_body(body, nid)
-        self._scope_stack.pop()
+        self._pop_scope()
 
     def _process_function_body(self, e: etree.Element, p: NodeId):
-        for c in e:
-            if c.tag is etree.Comment:
-                continue
-            t = str(c.tag)
-            h = getattr(self, f"_func_{t.lower()}", None)
-            if h:
-                h(c, p)
-            else:
-                self._func_generic(c, p)
+        dispatch = self._func_dispatch
+        for c in _iter_children(e):
+            h = dispatch.get(c.tag)
+            if h is None:
+                h = self._func_handler(c.tag)
+            h(c, p)
+
+    def _func_handler(self, tag: str) -> Callable:
+        """Resolve (and cache) the _func_<tag> handler, falling back to _func_generic."""
+        h = getattr(self, f"_func_{tag.lower()}", None) or self._func_generic
+        self._func_dispatch[tag] = h
+        return h
 
     # ===================================================================
     # SECTION 8: Statement Processing
@@ -864,7 +1078,7 @@ class GraphBuilder:
         - Symbol table entry for new variables
         """
         target = e.findtext("target")
-        src_elem = e.find("source")
+        src_elem = _find_child(e, "source")
         src = self._walk_expression(src_elem, p) if src_elem is not None else None
         a = self._add_node(f"{target}=…", "Assign", target=target)
         self._link(p, a, "contains")
@@ -882,7 +1096,7 @@ class GraphBuilder:
             self._declare_symbol(target, v)
 
     def _func_assert(self, e: etree.Element, p: NodeId):
-        cond = self._walk_expression(e.find("condition"), p)
+        cond = self._walk_expression(_find_child(e, "condition"), p)
         message = e.findtext("message", "")
         a = self._add_node("assert ...", "Assert", message=message)
         self._link(p, a, "contains")
@@ -897,7 +1111,7 @@ class GraphBuilder:
     
     def _walk_expression(self, e: etree.Element | None, p: NodeId) -> NodeId | None:
         """
-        Recursively process expression into graph nodes.
+        Process expression into graph nodes.
         
         Handles:
         - Variables: Create VarRef nodes (not Const lookups)
@@ -911,13 +1125,51 @@ class GraphBuilder:
         
         Key Design: Always creates VarRef for variables in expressions
         to preserve variable names (not constant values) in generated code.
+
+        Nested operands are walked with an explicit stack of
+        (elem, parent, edge_type, slot) entries rather than recursion, so
+        deep expressions do not hit the recursion limit. Each operand is
+        linked to its parent as soon as its node exists; an entry with a
+        slot list collects the node instead (the root, kwarg values).
+        A _DeferredKwarg entry creates a KwargExpr after its value.
         """
         if e is None:
             return None
-        tag = str(e.tag)
+        link = self._link
+        expression_node = self._expression_node
+        result = []
+        stack = [(e, p, None, result)]
+        while stack:
+            entry = stack.pop()
+            if type(entry) is _DeferredKwarg:
+                # The kwarg's value has already been built into entry.slot
+                name = entry.name
+                kw_node = self._add_node(f"{name}=...", "KwargExpr", name=name)
+                if entry.slot:
+                    link(kw_node, entry.slot[0], "value")
+                link(entry.parent, kw_node, "kwarg")
+                continue
+            elem, parent, edge_type, slot = entry
+            nid = expression_node(elem, parent, stack)
+            if nid:
+                if slot is not None:
+                    slot.append(nid)
+                else:
+                    link(parent, nid, edge_type)
+        return result[0] if result else None
+
+    @staticmethod
+    def _push_operands(stack: list, nid: NodeId, operands: list):
+        """Queue (elem, edge_type) operands of nid so they pop in order."""
+        for child, edge_type in reversed(operands):
+            stack.append((child, nid, edge_type, None))
+
+    def _expression_node(self, e: etree.Element, p: NodeId, stack: list) -> NodeId | None:
+        """Create the node for a single expression element and queue its operands."""
+        tag = e.tag
         
         if tag == "var":
-            name = e.text.strip() if e.text else ""
+            name = (e.text or "").strip()
             ref = e.get("ref")
             if ref:
                 name = ref
@@ -928,155 +1180,101 @@ class GraphBuilder:
                 return var_node
         
         if tag == "const":
-            txt = e.text.strip() if e.text else "?"
+            txt = (e.text or "?").strip()
             return self._add_node(txt, "ConstExpr", value=txt)
         
         if tag == "call":
             return self._walk_call_chain(e, p)
         
-        if tag == "attribute":
+        if tag == "attribute" or tag == "method":
+            # Attribute access / method call in expression: obj.name()
             obj_ref = e.get("ref")
-            attr_name = e.get("name")
-            if obj_ref and attr_name:
-                try:
-                    obj_n = self._lookup(obj_ref)
-                    attr = self._add_node(f"{obj_ref}.{attr_name}()", "MethodCallExpr",
-                                        object_ref=obj_ref, method=attr_name)
-                    self._link(attr, obj_n, "object")
-                    return attr
-                except NameError:
-                    # Create placeholder
-                    attr = self._add_node(f"{obj_ref}.{attr_name}()", "MethodCallExpr",
-                                        object_ref=obj_ref, method=attr_name)
-                    return attr
+            method_name = e.get("name")
+            if obj_ref and method_name:
+                method_node = self._add_node(f"{obj_ref}.{method_name}()", "MethodCallExpr",
+                                            object_ref=obj_ref, method=method_name)
+                # Unresolved objects leave the node as a placeholder
+                obj_n = self._active_symbols.get(obj_ref)
+                if obj_n is not None:
+                    self._link(method_node, obj_n, "object")
+                return method_node
         
         if tag == "comparison":
             # New comparison format with op attribute
             op = e.get("op", "==")
-            comp_node = self._add_node(f"comparison({op})", "ComparisonOp", operator=op)
+            label = _COMPARISON_LABELS.get(op) or f"comparison({op})"
+            comp_node = self._add_node(label, "ComparisonOp", operator=op)
             # Process left and right
-            left_elem = e.find("left")
-            right_elem = e.find("right")
+            operands = []
+            left_elem = _find_child(e, "left")
+            right_elem = _find_child(e, "right")
             if left_elem is not None:
-                for child in left_elem:
-                    if child.tag is not etree.Comment:
-                        left_expr = self._walk_expression(child, comp_node)
-                        if left_expr:
-                            self._link(comp_node, left_expr, "operand")
+                operands.extend((child, "operand") for child in _iter_children(left_elem))
             if right_elem is not None:
-                for child in right_elem:
-                    if child.tag is not etree.Comment:
-                        right_expr = self._walk_expression(child, comp_node)
-                        if right_expr:
-                            self._link(comp_node, right_expr, "operand")
+                operands.extend((child, "operand") for child in _iter_children(right_elem))
+            self._push_operands(stack, comp_node, operands)
             return comp_node
         
         if tag == "binary_op":
             op = e.get("op")
-            bin_node = self._add_node(f"binary_op({op})", "BinaryOp", operator=op)
+            label = _BINARY_OP_LABELS.get(op) or f"binary_op({op})"
+            bin_node = self._add_node(label, "BinaryOp", operator=op)
             # Process left and right if they exist
-            left_elem = e.find("left")
-            right_elem = e.find("right")
+            operands = []
+            left_elem = _find_child(e, "left")
+            right_elem = _find_child(e, "right")
             if left_elem is not None:
-                for child in left_elem:
-                    if child.tag is not etree.Comment:
-                        left_expr = self._walk_expression(child, bin_node)
-                        if left_expr:
-                            self._link(bin_node, left_expr, "operand")
+                operands.extend((child, "operand") for child in _iter_children(left_elem))
             if right_elem is not None:
-                for child in right_elem:
-                    if child.tag is not etree.Comment:
-                        right_expr = self._walk_expression(child, bin_node)
-                        if right_expr:
-                            self._link(bin_node, right_expr, "operand")
+                operands.extend((child, "operand") for child in _iter_children(right_elem))
             
             # Fallback: process all children
             if left_elem is None and right_elem is None:
-                for child in e:
-                    if child.tag is not etree.Comment:
-                        operand = self._walk_expression(child, bin_node)
-                        if operand:
-                            self._link(bin_node, operand, "operand")
+                operands.extend((child, "operand") for child in _iter_children(e))
+            self._push_operands(stack, bin_node, operands)
             return bin_node
         
         if tag == "equals":
             eq_node = self._add_node("==", "ComparisonOp", operator="==")
-            for child in e:
-                if child.tag is not etree.Comment:
-                    operand = self._walk_expression(child, eq_node)
-                    if operand:
-                        self._link(eq_node, operand, "operand")
+            self._push_operands(stack, eq_node, [(child, "operand") for child in _iter_children(e)])
             return eq_node
         
         if tag == "index":
             # Handle array indexing like sys.argv[1]
             idx_node = self._add_node("[]", "IndexExpr")
             # Check for base/index_value structure
-            base_elem = e.find("base")
-            index_val_elem = e.find("index_value")
+            operands = []
+            base_elem = _find_child(e, "base")
+            index_val_elem = _find_child(e, "index_value")
             if base_elem is not None:
-                for child in base_elem:
-                    if child.tag is not etree.Comment:
-                        base_expr = self._walk_expression(child, idx_node)
-                        if base_expr:
-                            self._link(idx_node, base_expr, "base")
+                operands.extend((child, "base") for child in _iter_children(base_elem))
             if index_val_elem is not None:
-                for child in index_val_elem:
-                    if child.tag is not etree.Comment:
-                        index_expr = self._walk_expression(child, idx_node)
-                        if index_expr:
-                            self._link(idx_node, index_expr, "index")
+                operands.extend((child, "index") for child in _iter_children(index_val_elem))
             
             # Fallback to old format
             if base_elem is None and index_val_elem is None:
-                for child in e:
-                    if child.tag is not etree.Comment:
-                        part = self._walk_expression(child, idx_node)
-                        if part:
-                            child_tag = str(child.tag)
-                            if child_tag == "var":
-                                self._link(idx_node, part, "base")
-                            else:
-                                self._link(idx_node, part, "index")
+                operands.extend((child, "base" if child.tag == "var" else "index")
+                                for child in _iter_children(e))
+            self._push_operands(stack, idx_node, operands)
             return idx_node
         
-        if tag == "method":
-            # Method call in expression
-            obj_ref = e.get("ref")
-            method_name = e.get("name")
-            if obj_ref and method_name:
-                try:
-                    obj_n = self._lookup(obj_ref)
-                    method_node = self._add_node(f"{obj_ref}.{method_name}()", "MethodCallExpr",
-                                                object_ref=obj_ref, method=method_name)
-                    self._link(method_node, obj_n, "object")
-                    return method_node
-                except NameError:
-                    method_node = self._add_node(f"{obj_ref}.{method_name}()", "MethodCallExpr",
-                                                object_ref=obj_ref, method=method_name)
-                    return method_node
-        
         if tag == "function":
             # Function call in expression
             func_name = e.get("name") or e.get("ref")
             func_node = self._add_node(func_name or "function", "FunctionCallExpr", function=func_name)
-            # Process arguments
-            for child in e:
-                if child.tag is not etree.Comment:
-                    child_tag = str(child.tag)
-                    if child_tag == "arg":
-                        arg_expr = self._walk_expression(child[0] if len(child) > 0 else child, func_node)
-                        if arg_expr:
-                            self._link(func_node, arg_expr, "arg")
-                    elif child_tag == "kwarg":
-                        kw_name = child.get("name")
-                        kw_val_elem = child[0] if len(child) > 0 else None
-                        if kw_val_elem is not None:
-                            kw_val = self._walk_expression(kw_val_elem, func_node)
-                            kw_node = self._add_node(f"{kw_name}=...", "KwargExpr", name=kw_name)
-                            if kw_val:
-                                self._link(kw_node, kw_val, "value")
-                            self._link(func_node, kw_node, "kwarg")
+            # Process arguments; a kwarg's value is built before its KwargExpr node
+            pending = []
+            for child in _iter_children(e):
+                child_tag = child.tag
+                if child_tag == "arg":
+                    pending.append((child[0] if len(child) > 0 else child, func_node, "arg", None))
+                elif child_tag == "kwarg":
+                    kw_val_elem = child[0] if len(child) > 0 else None
+                    if kw_val_elem is not None:
+                        slot = []
+                        pending.append((kw_val_elem, func_node, None, slot))
+                        pending.append(_DeferredKwarg(func_node, child.get("name"), slot))
+            stack.extend(reversed(pending))
             return func_node
         
         if tag == "constructor":
@@ -1086,7 +1284,7 @@ class GraphBuilder:
             return ctor_node
         
         if tag == "numpy_dtype":
-            dtype_val = e.text.strip() if e.text else "unknown"
+            dtype_val = (e.text or "unknown").strip()
             dtype_node = self._add_node(f"np.{dtype_val}", "DtypeExpr", dtype=dtype_val)
             return dtype_node
 
@@ -1098,23 +1296,18 @@ class GraphBuilder:
         if tag == "unary_op":
             # Handle <unary_op op="~">...</unary_op>
             op = e.get("op", "~")
-            unary_node = self._add_node(f"{op}", "UnaryOp", op=op)
+            unary_node = self._add_node(op, "UnaryOp", op=op)
             # Process operand
-            children = [c for c in e if c.tag is not etree.Comment]
-            if children:
-                operand = self._walk_expression(children[0], unary_node)
-                if operand:
-                    self._link(unary_node, operand, "operand")
+            operand = _first_child(e)
+            if operand is not None:
+                self._push_operands(stack, unary_node, [(operand, "operand")])
             return unary_node
 
         # Generic expression node
-        expr_node = self._add_node(tag, "Expr")
-        # Try to capture any child expressions
-        for child in e:
-            if child.tag is not etree.Comment:
-                child_expr = self._walk_expression(child, expr_node)
-                if child_expr:
-                    self._link(expr_node, child_expr, "contains")
+        expr_node = self._add_node(str(tag), "Expr")
+        # Try to capture any child expressions (leaves have none to queue)
+        if len(e):
+            self._push_operands(stack, expr_node, [(child, "contains") for child in _iter_children(e)])
         return expr_node
 
     def _func_call(self, e: etree.Element, p: NodeId):
@@ -1124,7 +1317,7 @@ class GraphBuilder:
 
     def _func_rawline(self, e: etree.Element, p: NodeId):
         """Process a raw Python line emitted verbatim (bypasses expression parsing)."""
-        text = e.text.strip() if e.text else ""
+        text = (e.text or "").strip()
         n = self._add_node(text, "RawLine", raw_text=text)
         self._link(p, n, "contains")
 
@@ -1134,13 +1327,13 @@ class GraphBuilder:
         
         Preserves code comments in graph for documentation generation.
         """
-        comment_text = e.text.strip() if e.text else ""
+        comment_text = (e.text or "").strip()
         c = self._add_node(comment_text, "Comment", text=comment_text)
         self._link(p, c, "contains")
     
     def _func_generic(self, e: etree.Element, p: NodeId):
         """Fallback handler for unknown function body elements."""
-        nid = self._add_node(str(e.tag), "FunctionBodyElement")
+        nid = self._add_node(e.tag, "FunctionBodyElement")
         self._link(p, nid, "contains")
 
     def _func_for(self, e: etree.Element, p: NodeId):
@@ -1154,19 +1347,25 @@ class GraphBuilder:
         iterable = range_attr if range_attr else e.get("in", "range(...)")
         f = self._add_node(f"for {var} in {iterable}", "For")
         self._link(p, f, "contains")
-        self._scope_stack.append({})
+        self._push_scope()
         lv = self._add_node(var, "LoopVariable")
         self._link(f, lv, "iterates")
         self._declare_symbol(var, lv)
         self._process_function_body(e, f)
-        self._scope_stack.pop()
+        self._pop_scope()
 
     def _func_print(self, e: etree.Element, p: NodeId):
-        # Check for fstring element
-        fstring_elem = e.find("fstring")
-        expression_elem = e.find("expression")
-        string_elem = e.find("string")
-        var_elem = e.find("var")
+        # Collect the first fstring/expression/string/var child in one
+        # (lxml-filtered) pass instead of one find per shape
+        add_node = self._add_node
+        link = self._link
+        parts = {}
+        for c in e.iterchildren("fstring", "expression", "string", "var"):
+            parts.setdefault(c.tag, c)
+        fstring_elem = parts.get("fstring")
+        expression_elem = parts.get("expression")
+        string_elem = parts.get("string")
+        var_elem = parts.get("var")
 
         if fstring_elem is not None and fstring_elem.text:
             # This is an f-string
@@ -1177,66 +1376,65 @@ class GraphBuilder:
                 # Convert {{ to { and }} to } for proper f-string interpolation
                 # (XML uses {{ to escape braces, but Python f-strings need single braces for variables)
                 fstring_text = fstring_text.replace('{{', '{').replace('}}', '}')
-                pr = self._add_node(f'print({fstring_text})', "Print")
+                pr = add_node(f'print({fstring_text})', "Print")
             else:
                 # Just the content, need to add f-string wrapper (passthrough format)
-                pr = self._add_node(f'print(f"{fstring_text}")', "Print")
-            self._link(p, pr, "contains")
+                pr = add_node(f'print(f"{fstring_text}")', "Print")
+            link(p, pr, "contains")
             # Link to variables used in the f-string
-            vars_elem = e.find("vars")
+            vars_elem = _find_child(e, "vars")
             if vars_elem is not None:
+                symbols = self._active_symbols
                 for v in vars_elem:
                     if v.tag == "var" and v.text:
                         name = v.text.strip()
-                        try:
-                            self._link(pr, self._lookup(name), "uses")
-                        except NameError:
-                            pass
+                        nid = symbols.get(name) if name else None
+                        if nid is not None:
+                            link(pr, nid, "uses")
         elif string_elem is not None and string_elem.text:
             # This is a simple string literal
             string_text = string_elem.text.strip()
-            pr = self._add_node(f'print({string_text})', "Print")
-            self._link(p, pr, "contains")
+            pr = add_node(f'print({string_text})', "Print")
+            link(p, pr, "contains")
         elif var_elem is not None and var_elem.text:
             # This is a variable reference like print(outputD)
             var_name = var_elem.text.strip()
-            pr = self._add_node(f'print({var_name})', "Print")
-            self._link(p, pr, "contains")
+            pr = add_node(f'print({var_name})', "Print")
+            link(p, pr, "contains")
             try:
-                self._link(pr, self._lookup(var_name), "uses")
+                link(pr, self._lookup(var_name), "uses")
             except NameError:
                 pass
         elif expression_elem is not None and expression_elem.text:
             # This is a regular expression like "-" * 24
             expr_text = expression_elem.text.strip()
-            pr = self._add_node(f'print({expr_text})', "Print")
-            self._link(p, pr, "contains")
+            pr = add_node(f'print({expr_text})', "Print")
+            link(p, pr, "contains")
         else:
             # Fallback to old format
             fmt = e.findtext("format", "")
-            pr = self._add_node(f'print("{fmt}")', "Print")
-            self._link(p, pr, "contains")
+            pr = add_node(f'print("{fmt}")', "Print")
+            link(p, pr, "contains")
+            symbols = self._active_symbols
             for v in e:
                 if v.tag == "var":
-                    name = v.text.strip() if v.text else ""
-                    if name:
-                        try:
-                            self._link(pr, self._lookup(name), "uses")
-                        except NameError:
-                            pass
+                    name = (v.text or "").strip()
+                    nid = symbols.get(name) if name else None
+                    if nid is not None:
+                        link(pr, nid, "uses")
                 elif v.tag == "index":
-                    base_elem = v.find("var")
-                    idx_elem = v.find("const") or v.find("var")
+                    base_elem = _find_child(v, "var")
+                    idx_elem = _find_child(v, "const") or _find_child(v, "var")
                     if base_elem is not None and base_elem.text:
                         base = base_elem.text.strip()
-                        idx = idx_elem.text.strip() if idx_elem.text else "?"
+                        idx = (idx_elem.text or "?").strip()
                         try:
                             b_n = self._lookup(base)
-                            i_n = self._add_node(idx, "Index")
-                            acc = self._add_node("[]", "IndexAccess")
-                            self._link(acc, b_n, "base")
-                            self._link(acc, i_n, "index")
-                            self._link(pr, acc, "uses")
+                            i_n = add_node(idx, "Index")
+                            acc = add_node("[]", "IndexAccess")
+                            link(acc, b_n, "base")
+                            link(acc, i_n, "index")
+                            link(pr, acc, "uses")
                         except NameError:
                             pass
 
@@ -1267,7 +1465,7 @@ class GraphBuilder:
             cond_node = self._add_node(cond_attr, "ConditionExpr", condition_text=cond_attr)
         else:
             # Try to parse condition element
-            cond_elem = e.find("condition")
+            cond_elem = _find_child(e, "condition")
             if cond_elem is not None:
                 cond_node = self._walk_expression(cond_elem, p)
         
@@ -1277,51 +1475,30 @@ class GraphBuilder:
         if cond_node:
             self._link(i, cond_node, "condition")
         
-        # Process then branch with 'then' edge type
-        then_elem = e.find("then")
-        if then_elem is not None:
-            # Track edges before processing
-            edges_before = set(self.graph.out_edges(i))
-            
-            for child in then_elem:
-                if child.tag is etree.Comment:
-                    continue
-                tag = str(child.tag)
-                h = getattr(self, f"_func_{tag.lower()}", None)
-                if h:
-                    h(child, i)
-                else:
-                    self._func_generic(child, i)
-            
-            # Find new edges and change their type to 'then'
-            edges_after = set(self.graph.out_edges(i))
-            new_edges = edges_after - edges_before
-            for src, tgt in new_edges:
-                if self.graph[src][tgt].get('type') == 'contains':
-                    self.graph[src][tgt]['type'] = 'then'
-        
-        # Process else branch with 'else' edge type
-        else_elem = e.find("else")
-        if else_elem is not None:
-            # Track edges before processing
-            edges_before = set(self.graph.out_edges(i))
-            
-            for child in else_elem:
-                if child.tag is etree.Comment:
-                    continue
-                tag = str(child.tag)
-                h = getattr(self, f"_func_{tag.lower()}", None)
-                if h:
-                    h(child, i)
-                else:
-                    self._func_generic(child, i)
-            
-            # Find new edges and change their type to 'else'
-            edges_after = set(self.graph.out_edges(i))
-            new_edges = edges_after - edges_before
-            for src, tgt in new_edges:
-                if self.graph[src][tgt].get('type') == 'contains':
-                    self.graph[src][tgt]['type'] = 'else'
+        # Process then/else branches; the edge type is the branch tag
+        for branch in ("then", "else"):
+            branch_elem = _find_child(e, branch)
+            if branch_elem is not None:
+                # Edges are still pending: remember where this branch starts
+                start = len(self._pending_edges)
+                
+                self._process_function_body(branch_elem, i)
+                
+                # Retype the branch's 'contains' edges from the If node
+                self._retype_branch_edges(i, start, branch)
+
+    def _retype_branch_edges(self, i: NodeId, start: int, edge_type: str):
+        """
+        Retype pending i→child 'contains' edges queued since start to edge_type.
+
+        Only the branch's own suffix of the pending list is scanned, and each
+        match is a tuple replacement in the list; the graph is never touched.
+        """
+        edges = self._pending_edges
+        for k in range(start, len(edges)):
+            src, dst, t = edges[k]
+            if src == i and t == 'contains':
+                edges[k] = (src, dst, edge_type)
 
     def _process_entrypoint(self, e: etree.Element, p: NodeId):
         """
@@ -1331,10 +1508,91 @@ class GraphBuilder:
         """
         ep = self._add_node("EntryPoint", "EntryPoint")
         self._link(p, ep, "contains")
-        if_elem = e.find("If")
+        if_elem = _find_child(e, "If")
         if if_elem is not None:
             self._func_if(if_elem, ep)
 
+# ======================================================================
+# GraphML Output
+# ======================================================================
+# Streams the builder's graph straight to GraphML text. The layout matches
+# nx.write_graphml (lxml backend) byte for byte, but skips its per-value
+# type inference and intermediate element tree.
+
+# Characters lxml refuses in text and attributes (XML 1.0 Char production)
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+_GRAPHML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">'
+)
+
+
+def _xml_text(s: str) -> str:
+    """Escape element text the way lxml serializes it."""
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+
+
+def _xml_attr(s: str) -> str:
+    """Escape an attribute value the way lxml serializes it."""
+    return (_xml_text(s).replace('"', "&quot;")
+            .replace("\n", "&#10;").replace("\t", "&#9;"))
+
+
+def _graphml_element(tag: str, head: str, data: dict, keys: Dict[str, str]) -> str:
+    """One <node>/<edge> element with its <data> children."""
+    if not data:
+        return f"<{tag} {head}/>\n"
+    rows = "".join(f'  <data key="{keys[k]}">{_xml_text(v)}</data>\n' for k, v in data.items())
+    return f"<{tag} {head}>\n{rows}</{tag}>\n"
+
+
+def write_graphml(graph: Graph, path) -> None:
+    """
+    Write a GraphBuilder graph to path as GraphML.
+
+    Builder graphs only carry string attributes, so every key is
+    attr.type="string". Anything else (non-string values, graph-level
+    attributes, characters XML cannot represent) is handed to
+    nx.write_graphml unchanged, so it fails or converts exactly as
+    NetworkX does.
+    """
+    if graph.graph or any(_XML_ILLEGAL.search(str(n)) for n in graph):
+        nx.write_graphml(graph, path)
+        return
+
+    node_keys: Dict[str, str] = {}
+    edge_keys: Dict[str, str] = {}
+    key_lines = []
+    for scope, keys, datas in (("node", node_keys, (d for _, d in graph.nodes(data=True))),
+                               ("edge", edge_keys, (d for _, _, d in graph.edges(data=True)))):
+        for d in datas:
+            for k, v in d.items():
+                if (type(v) is not str or type(k) is not str
+                        or _XML_ILLEGAL.search(v) or _XML_ILLEGAL.search(k)):
+                    nx.write_graphml(graph, path)
+                    return
+                if k not in keys:
+                    keys[k] = kid = f"d{len(key_lines)}"
+                    key_lines.append(f'<key id="{kid}" for="{scope}" attr.name="{_xml_attr(k)}" '
+                                     f'attr.type="string"/>\n')
+
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 20) as f:
+        f.write(_GRAPHML_HEADER)
+        # Keys are listed newest first, as NetworkX inserts each at the front
+        f.writelines(reversed(key_lines))
+        f.write('<graph edgedefault="directed">')
+        f.writelines(_graphml_element("node", f'id="{_xml_attr(str(n))}"', d, node_keys)
+                     for n, d in graph.nodes(data=True))
+        f.writelines(_graphml_element("edge", f'source="{_xml_attr(str(u))}" target="{_xml_attr(str(v))}"',
+                                      d, edge_keys)
+                     for u, v, d in graph.edges(data=True))
+        f.write("</graph></graphml>")
+
+
 # ======================================================================
 # CLI Entry Point
 # ======================================================================
@@ -1352,16 +1610,12 @@ def main():
     g = builder.build()
 
     out = path.with_suffix(".graphml")
-    nx.write_graphml(g, out)
+    write_graphml(g, out)
     print(f"Graph -> {out}")
 
     print("\n--- Summary ---")
     print(f"Nodes: {g.number_of_nodes()}  Edges: {g.number_of_edges()}")
-    kinds = {}
-    for n, d in g.nodes(data=True):
-        k = d.get("kind", "?")
-        kinds[k] = kinds.get(k, 0) + 1
-    for k, c in sorted(kinds.items()):
+    for k, c in sorted(builder.kind_counts.items()):
         print(f"  {k:20} {c}")
 
     #builder.print_graph_readable()
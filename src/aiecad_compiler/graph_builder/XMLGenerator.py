@@ -21,10 +21,179 @@ Architecture:
 - XMLTransformer: Main orchestrator for transformation
 """
 
+from copy import deepcopy
+from functools import cached_property, lru_cache
+from itertools import chain
 from lxml import etree
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Mapping, Tuple, Optional
 import re
+import sys
+
+
+# Element constructors, bound once at module level for the emission helpers
+_Element = etree.Element
+_SubElement = etree.SubElement
+
+
+# Precompiled queries against the simple XML; these are evaluated by lxml's
+# XPath engine instead of re-parsing the ElementPath string on every call.
+_XP_SYMBOLS = etree.XPath("./Symbols")
+_XP_DATAFLOW = etree.XPath("./DataFlow")
+# First CoreFunction with a non-empty loop_count (at most one match)
+_XP_LOOPED_COREFUNC = etree.XPath("./CoreFunction[@loop_count != ''][1]")
+
+
+# Shared parser for the simple XML: no ID table, and whitespace-only text and
+# comments are dropped at parse time since the transformer never reads them.
+# GUI exports declare no DTD entities, so none are resolved.
+_SIMPLE_XML_PARSER = etree.XMLParser(collect_ids=False, remove_blank_text=True,
+                                     remove_comments=True, resolve_entities=False)
+
+
+# Attribute sets of fixed-shape nodes, passed as attrib= (lxml copies them)
+# rather than rebuilt from keyword arguments at every emission
+_PLACEMENT_KWARG_ATTRIB = {"name": "placement"}
+_TILE_CTOR_ATTRIB = {"ref": "Tile"}
+_CONS_METHOD_ATTRIB = {"name": "cons"}
+_PROD_METHOD_ATTRIB = {"name": "prod"}
+# rt.<method> targets of the runtime sequence and its operations
+_RT_SEQUENCE_ATTRIB = {"ref": "rt", "name": "sequence"}
+_RT_START_ATTRIB = {"ref": "rt", "name": "start"}
+_RT_FILL_ATTRIB = {"ref": "rt", "name": "fill"}
+_RT_DRAIN_ATTRIB = {"ref": "rt", "name": "drain"}
+# is_placed=False attribute of iron.jit functions
+_IS_PLACED_KWARG_ATTRIB = {"name": "is_placed", "value": "False"}
+
+
+# Marks a missing dict entry where None could be a stored value
+_MISSING = object()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """sys.intern that passes missing attributes (None) through."""
+    return sys.intern(value) if value is not None else None
+
+
+def _first(matches: list) -> Optional[etree.Element]:
+    """Return the first XPath match, or None (mirrors Element.find)."""
+    return matches[0] if matches else None
+
+
+def _arg_var(make, name: str) -> etree.Element:
+    """Build a positional <arg><var>name</var></arg> with the element factory make."""
+    arg = make("arg")
+    var = make("var")
+    var.text = name
+    arg.append(var)
+    return arg
+
+
+@lru_cache(maxsize=256)
+def _parse_shape(expr: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a shape expression into (numerator, denominator).
+
+    Returns (expr, None) unless the expression contains exactly one '/'.
+    The same handful of shape strings recur across types and FIFOs, so
+    results are cached.
+    """
+    numerator, sep, denominator = expr.partition("/")
+    if not sep or "/" in denominator:
+        return expr, None
+    return numerator.strip(), denominator.strip()
+
+
+_TILE_RE = re.compile(r'Tile\((\d+),\s*(\d+)\)')
+
+# Leading (possibly dotted) function name and its opening paren in a call
+# expression like "iron.arange(...)"
+_CALL_NAME_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_.]*)\(')
+
+# One non-empty, already-stripped entry of a comma-separated list
+# (equivalent to split(",") + strip() + dropping empty entries)
+_LIST_ITEM_RE = re.compile(r'[^,\s](?:[^,]*[^,\s])?')
+
+
+@lru_cache(maxsize=256)
+def _parse_tile(placement: str) -> Optional[Tuple[str, str]]:
+    """Parse "Tile(x, y)" into its (x, y) strings, or None if it doesn't match."""
+    match = _TILE_RE.match(placement)
+    return match.groups() if match else None
+
+
+# ObjectFifo split/join method chains are deep-copied from these pre-parsed
+# skeletons; references and list entries are then filled in on the
+# copy, so nothing is serialized and re-parsed per FIFO.
+_SPLIT_SKELETON = etree.fromstring(
+    '<ObjectFifo><source><method_chain>'
+    '<base><var ref=""/></base>'
+    '<call><method name="cons"/></call>'
+    '<call><method name="split">'
+    '<kwarg name="obj_types"><list/></kwarg>'
+    '<kwarg name="offsets"><list/></kwarg>'
+    '<kwarg name="names"><list/></kwarg>'
+    '<kwarg name="placement"><constructor ref="Tile"/></kwarg>'
+    '</method></call>'
+    '</method_chain></source></ObjectFifo>'
+)
+_JOIN_SKELETON = etree.fromstring(
+    '<ObjectFifo><source><method_chain>'
+    '<base><var ref=""/></base>'
+    '<call><method name="prod"/></call>'
+    '<call><method name="join">'
+    '<kwarg name="obj_types"><list/></kwarg>'
+    '<kwarg name="names"><list/></kwarg>'
+    '<kwarg name="placement"><constructor ref="Tile"/></kwarg>'
+    '<kwarg name="offsets"><list/></kwarg>'
+    '</method></call>'
+    '</method_chain></source></ObjectFifo>'
+)
+# One computed split/join offset: (tensor.numel() // divisor) * index
+_OFFSET_TERM = etree.fromstring(
+    '<binary_op op="*">'
+    '<binary_op op="//"><method ref="" name="numel"/><const/></binary_op>'
+    '<const/>'
+    '</binary_op>'
+)
+_TYPE_VARIATION_TEMPLATE = (
+    '<TypeAbstraction name=""><ndarray>'
+    '<shape><tuple><expr>{expr}</expr></tuple></shape>'
+    '<dtype><numpy_dtype/></dtype>'
+    '</ndarray></TypeAbstraction>'
+)
+# Generated type variations are deep-copied from these skeletons and patched:
+# tensor.numel() for divisor "1", tensor.numel() // divisor otherwise.
+_TYPE_VARIATION_NUMEL = etree.fromstring(_TYPE_VARIATION_TEMPLATE.format(
+    expr='<method ref="" name="numel"/>'))
+_TYPE_VARIATION_DIV = etree.fromstring(_TYPE_VARIATION_TEMPLATE.format(
+    expr='<binary_op op="//"><method ref="" name="numel"/><const/></binary_op>'))
+
+# Inline TensorAccessPattern for a Fill/Drain; only the tensor reference of
+# every numel() and the column multiplier of the offset vary per use:
+#   tensor_dims=[t.numel()], offset=(t.numel() // 4) * column,
+#   sizes=[(t.numel() // 4) // (t.numel() // 8), t.numel() // 8],
+#   strides=[t.numel() // 8, 1]
+_TAP_TEMPLATE = etree.fromstring(
+    '<constructor ref="TensorAccessPattern">'
+    '<kwarg name="tensor_dims"><list><method ref="" name="numel"/></list></kwarg>'
+    '<kwarg name="offset"><binary_op op="*">'
+    '<binary_op op="//"><method ref="" name="numel"/><const>4</const></binary_op>'
+    '<const/>'
+    '</binary_op></kwarg>'
+    '<kwarg name="sizes"><list>'
+    '<binary_op op="//">'
+    '<binary_op op="//"><method ref="" name="numel"/><const>4</const></binary_op>'
+    '<binary_op op="//"><method ref="" name="numel"/><const>8</const></binary_op>'
+    '</binary_op>'
+    '<binary_op op="//"><method ref="" name="numel"/><const>8</const></binary_op>'
+    '</list></kwarg>'
+    '<kwarg name="strides"><list>'
+    '<binary_op op="//"><method ref="" name="numel"/><const>8</const></binary_op>'
+    '<const>1</const>'
+    '</list></kwarg>'
+    '</constructor>'
+)
 
 
 class NamingConventions:
@@ -44,12 +213,12 @@ class NamingConventions:
     }
 
     @classmethod
-    def generate_objectfifo_name(cls, attrs: Dict[str, str], num_workers: int = 2) -> str:
+    def generate_objectfifo_name(cls, attrs: Mapping[str, str], num_workers: int = 2) -> str:
         """
         Generate ObjectFifo name from context attributes.
 
         Args:
-            attrs: Dictionary of attributes from XML element
+            attrs: Attributes of the XML element
             num_workers: Number of workers per column (for worker suffix)
 
         Returns:
@@ -59,16 +228,20 @@ class NamingConventions:
             {context="L3_L2", data="A", column="0"} → "SHIM_L3_L2_A1A2_col0"
             {context="L1_L1", stage="add_to_relu", worker="1"} → "L1_L1_add_to_relu_1"
         """
-        context = attrs.get("context", "")
-        data = attrs.get("data", "")
-        column = attrs.get("column", "")
-        worker = attrs.get("worker", "")
-        stage = attrs.get("stage", "")
+        return cls._gen_name(sys.intern(attrs.get("context", "")),
+                             sys.intern(attrs.get("data", "")),
+                             attrs.get("column", ""), attrs.get("worker", ""),
+                             attrs.get("stage", ""), num_workers)
 
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _gen_name(cls, context: str, data: str, column: str, worker: str,
+                  stage: str, num_workers: int) -> str:
+        """Cached body of generate_objectfifo_name; the same contexts recur across FIFOs."""
         template = cls.OBJECTFIFO_TEMPLATES.get(context, "{data}_col{column}")
 
         # For L3_L2/L2_L3: generate worker pair notation based on column
-        if context in ["L3_L2", "L2_L3", "L2_L1", "L1_L2"] and column.isdigit():
+        if context in ("L3_L2", "L2_L3", "L2_L1", "L1_L2") and column.isdigit():
             col_num = int(column)
             worker_idx = col_num * num_workers + 1
             # Format as A1A2 not A12 (each worker number prefixed with data letter)
@@ -83,7 +256,7 @@ class NamingConventions:
         return template.format(data=data, workers="", column=column)
 
     @classmethod
-    def generate_split_output_names(cls, attrs: Dict[str, str], num_outputs: int) -> List[str]:
+    def generate_split_output_names(cls, attrs: Mapping[str, str], num_outputs: int) -> List[str]:
         """
         Generate individual split output names.
 
@@ -94,20 +267,26 @@ class NamingConventions:
         Returns:
             List of generated output names
         """
-        data = attrs.get("data", "")
-        column = attrs.get("column", "")
+        return list(cls._split_names(attrs.get("data", ""), attrs.get("column", ""),
+                                     attrs.get("name", "split"), num_outputs))
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _split_names(data: str, column: str, name: str, num_outputs: int) -> Tuple[str, ...]:
+        """Cached body of generate_split_output_names."""
         if not column.isdigit():
-            name = attrs.get("name", "split")
-            return [f"{name}_out{i + 1}" for i in range(num_outputs)]
+            prefix = name + "_out"
+            return tuple(prefix + idx for idx in map(str, range(1, num_outputs + 1)))
 
         col_num = int(column)
         base_idx = col_num * num_outputs + 1
-        return [f"MEM_L2_L1_{data}{base_idx + i}_col{column}"
-                for i in range(num_outputs)]
+        prefix = "MEM_L2_L1_" + data
+        suffix = "_col" + column
+        return tuple(prefix + idx + suffix
+                     for idx in map(str, range(base_idx, base_idx + num_outputs)))
 
     @classmethod
-    def generate_join_input_names(cls, attrs: Dict[str, str], num_inputs: int) -> List[str]:
+    def generate_join_input_names(cls, attrs: Mapping[str, str], num_inputs: int) -> List[str]:
         """
         Generate individual join input names.
 
@@ -118,17 +297,23 @@ class NamingConventions:
         Returns:
             List of generated input names
         """
-        data = attrs.get("data", "")
-        column = attrs.get("column", "")
+        return list(cls._join_names(attrs.get("data", ""), attrs.get("column", ""),
+                                    attrs.get("name", "join"), num_inputs))
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _join_names(data: str, column: str, name: str, num_inputs: int) -> Tuple[str, ...]:
+        """Cached body of generate_join_input_names."""
         if not column.isdigit():
-            name = attrs.get("name", "join")
-            return [f"{name}_in{i + 1}" for i in range(num_inputs)]
+            prefix = name + "_in"
+            return tuple(prefix + idx for idx in map(str, range(1, num_inputs + 1)))
 
         col_num = int(column)
         base_idx = col_num * num_inputs + 1
-        return [f"MEM_L1_L2_{data}{base_idx + i}_col{column}"
-                for i in range(num_inputs)]
+        prefix = "MEM_L1_L2_" + data
+        suffix = "_col" + column
+        return tuple(prefix + idx + suffix
+                     for idx in map(str, range(base_idx, base_idx + num_inputs)))
 
 
 class ExpressionExpander:
@@ -161,6 +346,10 @@ class ExpressionExpander:
         self.symbols = symbols
         self.function_params = function_params
         self.tensor_refs = {}  # Will be populated from function parameters
+        self.sorted_tensor_refs = ()  # (letter, reference) pairs ordered by letter
+        self.primary_tensor_ref = "input"  # First reference; default for type shapes
+        self._tensor_ref_cache = {}  # data key → resolved reference
+        self._expand_cache = {}  # (expr, tensor_ref) → expanded expression
 
     def set_tensor_refs(self, param_map: Dict[str, str]):
         """
@@ -170,10 +359,16 @@ class ExpressionExpander:
             param_map: e.g., {"A": "inputA", "B": "inputB", "D": "outputD"}
         """
         self.tensor_refs = param_map
+        self.sorted_tensor_refs = tuple(sorted(param_map.items()))
+        self.primary_tensor_ref = next(iter(param_map.values()), "input")
+        self._tensor_ref_cache = {}
 
     def get_tensor_ref(self, data_key: str) -> str:
         """Get actual tensor reference for a data key."""
-        return self.tensor_refs.get(data_key, data_key.lower())
+        ref = self._tensor_ref_cache.get(data_key)
+        if ref is None:
+            ref = self._tensor_ref_cache[data_key] = self.tensor_refs.get(data_key, data_key.lower())
+        return ref
 
     def expand_shape_expression(self, expr: str, tensor_ref: Optional[str] = None) -> str:
         """
@@ -184,9 +379,20 @@ class ExpressionExpander:
             "data_size / 4" → "((inputA.numel()) // 4)"
             "data_size / 8" → "((inputA.numel()) // 8)"
         """
+        # The same handful of expressions recur across loops, tilers and TAPs
+        key = (expr, tensor_ref)
+        expanded = self._expand_cache.get(key)
+        if expanded is None:
+            expanded = self._expand_cache[key] = self._expand_shape_expression(expr, tensor_ref)
+        return expanded
+
+    def _expand_shape_expression(self, expr: str, tensor_ref: Optional[str]) -> str:
+        """Uncached body of expand_shape_expression."""
+        symbols = self.symbols
+
         # If it's just a constant reference
-        if expr in self.symbols:
-            value = self.symbols[expr]
+        value = symbols.get(expr, _MISSING)
+        if value is not _MISSING:
             # If we have a tensor reference, use .numel()
             if tensor_ref:
                 return f"({tensor_ref}.numel())"
@@ -194,23 +400,16 @@ class ExpressionExpander:
             return value
 
         # Parse division expressions
-        if "/" in expr:
-            parts = expr.split("/")
-            if len(parts) == 2:
-                numerator = parts[0].strip()
-                denominator = parts[1].strip()
-
-                # Expand numerator
-                if numerator in self.symbols:
-                    if tensor_ref:
-                        numerator_expanded = f"{tensor_ref}.numel()"
-                    else:
-                        numerator_expanded = self.symbols.get(numerator, numerator)
-                else:
-                    numerator_expanded = numerator
+        numerator, denominator = _parse_shape(expr)
+        if denominator is not None:
+            # Expand numerator
+            if tensor_ref and numerator in symbols:
+                numerator_expanded = f"{tensor_ref}.numel()"
+            else:
+                numerator_expanded = symbols.get(numerator, numerator)
 
-                # Use integer division
-                return f"(({numerator_expanded}) // {denominator})"
+            # Use integer division
+            return f"(({numerator_expanded}) // {denominator})"
 
         return expr
 
@@ -231,188 +430,130 @@ class MethodChainBuilder:
 
     def __init__(self, expander: ExpressionExpander):
         self.expander = expander
+        self._get_tensor_ref = expander.get_tensor_ref
 
     def build_split_chain(self, source_name: str, num_outputs: int,
                          output_type: str, output_names: List[str],
-                         placement: str, attrs: Dict[str, str],
+                         placement: str, attrs: Mapping[str, str],
                          source_type_divisor: int = 1,
                          explicit_offsets: Optional[List[str]] = None,
                          dims_to_stream: Optional[str] = None) -> etree.Element:
         """
         Build <ObjectFifo> element with .cons().split() method chain.
 
-        Args:
-            source_type_divisor: Divisor from source FIFO's type (e.g., 16 for memtile_ty = N/16)
-
         Args:
             source_type_divisor: Divisor from source FIFO's type (e.g., 16 for memtile_ty = N/16)
 
         Returns XML structure for split operation.
         """
         # Determine tensor reference from data attribute
-        data = attrs.get("data", "")
-        tensor_ref = self.expander.get_tensor_ref(data)
-
-        obj_fifo = etree.Element("ObjectFifo")
-        source_elem = etree.SubElement(obj_fifo, "source")
-        method_chain = etree.SubElement(source_elem, "method_chain")
-
-        # Base: reference to source ObjectFifo
-        base = etree.SubElement(method_chain, "base")
-        var = etree.SubElement(base, "var", ref=source_name)
-
-        # Call: .cons()
-        call_cons = etree.SubElement(method_chain, "call")
-        method_cons = etree.SubElement(call_cons, "method", name="cons")
+        tensor_ref = self._get_tensor_ref(attrs.get("data", ""))
 
-        # Call: .split(...)
-        call_split = etree.SubElement(method_chain, "call")
-        method_split = etree.SubElement(call_split, "method", name="split")
+        obj_fifo = deepcopy(_SPLIT_SKELETON)
+        method_chain = obj_fifo[0][0]
+        method_chain[0][0].set("ref", source_name)
+        method_split = method_chain[2][0]
+        kwarg_types, kwarg_offsets, kwarg_names, kwarg_placement = method_split
 
-        # kwarg: obj_types
-        kwarg_types = etree.SubElement(method_split, "kwarg", name="obj_types")
-        type_list = etree.SubElement(kwarg_types, "list")
-        for _ in range(num_outputs):
-            type_ref_elem = etree.SubElement(type_list, "type_ref")
-            type_ref_elem.text = output_type
-
-        # kwarg: offsets
-        kwarg_offsets = etree.SubElement(method_split, "kwarg", name="offsets")
-        offset_list = etree.SubElement(kwarg_offsets, "list")
-
-        if explicit_offsets:
-            # Use explicit symbolic offsets from the GUI XML (as raw const text)
-            for off in explicit_offsets:
-                off_elem = etree.SubElement(offset_list, "const")
-                off_elem.text = str(off).strip()
-        else:
-            # Calculate offsets as: (tensor.numel() // total_divisor) * i
-            total_divisor = source_type_divisor * num_outputs
-            for i in range(num_outputs):
-                offset_expr = etree.SubElement(offset_list, "binary_op", op="*")
-                div_expr = etree.SubElement(offset_expr, "binary_op", op="//")
-                method_elem = etree.SubElement(div_expr, "method", ref=tensor_ref, name="numel")
-                const_divisor = etree.SubElement(div_expr, "const")
-                const_divisor.text = str(total_divisor)
-                const_i = etree.SubElement(offset_expr, "const")
-                const_i.text = str(i)
-
-        # kwarg: names
-        kwarg_names = etree.SubElement(method_split, "kwarg", name="names")
-        name_list = etree.SubElement(kwarg_names, "list")
-        for name in output_names:
-            string_elem = etree.SubElement(name_list, "string")
-            string_elem.text = name
-
-        # kwarg: placement
-        self._add_placement_kwarg(method_split, placement)
-
-        # kwarg: dims_to_stream — list of N references to the same dims symbol
-        if dims_to_stream:
-            kwarg_dims = etree.SubElement(method_split, "kwarg", name="dims_to_stream")
-            list_elem = etree.SubElement(kwarg_dims, "list")
-            for _ in range(num_outputs):
-                const_elem = etree.SubElement(list_elem, "const")
-                const_elem.text = dims_to_stream
+        self._fill_repeated(kwarg_types[0], "type_ref", output_type, num_outputs)
+        self._fill_offsets(kwarg_offsets[0], tensor_ref, source_type_divisor * num_outputs,
+                           num_outputs, explicit_offsets)
+        self._fill_names(kwarg_names[0], output_names)
+        self._fill_tile_args(kwarg_placement[0], placement)
+        self._append_dims_kwarg(method_split, "dims_to_stream", dims_to_stream, num_outputs)
 
         return obj_fifo
 
     def build_join_chain(self, dest_name: str, num_inputs: int,
                         input_type: str, input_names: List[str],
-                        placement: str, attrs: Dict[str, str],
+                        placement: str, attrs: Mapping[str, str],
                         dest_type_divisor: int = 1,
                         explicit_offsets: Optional[List[str]] = None,
                         dims_from_stream: Optional[str] = None) -> etree.Element:
         """
         Build <ObjectFifo> element with .prod().join() method chain.
 
-        Args:
-            dest_type_divisor: Divisor from dest FIFO's type (e.g., 16 for memtile_ty = N/16)
-
         Args:
             dest_type_divisor: Divisor from dest FIFO's type (e.g., 16 for memtile_ty = N/16)
         """
-        data = attrs.get("data", "")
-        tensor_ref = self.expander.get_tensor_ref(data)
-
-        obj_fifo = etree.Element("ObjectFifo")
-        source_elem = etree.SubElement(obj_fifo, "source")
-        method_chain = etree.SubElement(source_elem, "method_chain")
-
-        # Base: reference to dest ObjectFifo
-        base = etree.SubElement(method_chain, "base")
-        var = etree.SubElement(base, "var", ref=dest_name)
-
-        # Call: .prod()
-        call_prod = etree.SubElement(method_chain, "call")
-        method_prod = etree.SubElement(call_prod, "method", name="prod")
-
-        # Call: .join(...)
-        call_join = etree.SubElement(method_chain, "call")
-        method_join = etree.SubElement(call_join, "method", name="join")
-
-        # kwarg: obj_types
-        kwarg_types = etree.SubElement(method_join, "kwarg", name="obj_types")
-        type_list = etree.SubElement(kwarg_types, "list")
-        for _ in range(num_inputs):
-            type_ref_elem = etree.SubElement(type_list, "type_ref")
-            type_ref_elem.text = input_type
-
-        # kwarg: names
-        kwarg_names = etree.SubElement(method_join, "kwarg", name="names")
-        name_list = etree.SubElement(kwarg_names, "list")
-        for name in input_names:
-            string_elem = etree.SubElement(name_list, "string")
-            string_elem.text = name
-
-        # kwarg: placement
-        self._add_placement_kwarg(method_join, placement)
-
-        # kwarg: offsets
-        kwarg_offsets = etree.SubElement(method_join, "kwarg", name="offsets")
-        offset_list = etree.SubElement(kwarg_offsets, "list")
+        tensor_ref = self._get_tensor_ref(attrs.get("data", ""))
 
-        if explicit_offsets:
-            # Use explicit symbolic offsets from the GUI XML (as raw const text)
-            for off in explicit_offsets:
-                off_elem = etree.SubElement(offset_list, "const")
-                off_elem.text = str(off).strip()
-        else:
-            # Calculate offsets as: (tensor.numel() // total_divisor) * i
-            total_divisor = dest_type_divisor * num_inputs
-            for i in range(num_inputs):
-                offset_expr = etree.SubElement(offset_list, "binary_op", op="*")
-                div_expr = etree.SubElement(offset_expr, "binary_op", op="//")
-                method_elem = etree.SubElement(div_expr, "method", ref=tensor_ref, name="numel")
-                const_divisor = etree.SubElement(div_expr, "const")
-                const_divisor.text = str(total_divisor)
-                const_i = etree.SubElement(offset_expr, "const")
-                const_i.text = str(i)
-
-        # kwarg: dims_from_stream — list of N references to the same dims symbol
-        if dims_from_stream:
-            kwarg_dims = etree.SubElement(method_join, "kwarg", name="dims_from_stream")
-            list_elem = etree.SubElement(kwarg_dims, "list")
-            for _ in range(num_inputs):
-                const_elem = etree.SubElement(list_elem, "const")
-                const_elem.text = dims_from_stream
+        obj_fifo = deepcopy(_JOIN_SKELETON)
+        method_chain = obj_fifo[0][0]
+        method_chain[0][0].set("ref", dest_name)
+        method_join = method_chain[2][0]
+        kwarg_types, kwarg_names, kwarg_placement, kwarg_offsets = method_join
 
-        return obj_fifo
+        self._fill_repeated(kwarg_types[0], "type_ref", input_type, num_inputs)
+        self._fill_names(kwarg_names[0], input_names)
+        self._fill_tile_args(kwarg_placement[0], placement)
+        self._fill_offsets(kwarg_offsets[0], tensor_ref, dest_type_divisor * num_inputs,
+                           num_inputs, explicit_offsets)
+        self._append_dims_kwarg(method_join, "dims_from_stream", dims_from_stream, num_inputs)
 
-    def _add_placement_kwarg(self, parent: etree.Element, placement: str):
-        """Add placement kwarg with Tile constructor."""
-        kwarg_placement = etree.SubElement(parent, "kwarg", name="placement")
-        constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
+        return obj_fifo
 
-        # Parse Tile(x, y)
-        match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-        if match:
-            arg_x = etree.SubElement(constructor, "arg")
-            const_x = etree.SubElement(arg_x, "const")
-            const_x.text = match.group(1)
-            arg_y = etree.SubElement(constructor, "arg")
-            const_y = etree.SubElement(arg_y, "const")
-            const_y.text = match.group(2)
+    @staticmethod
+    def _fill_repeated(list_elem: etree.Element, tag: str, text: str, count: int):
+        """Append `count` copies of <tag>text</tag> to list_elem."""
+        make = list_elem.makeelement
+        for _ in range(count):
+            entry = make(tag)
+            entry.text = text
+            list_elem.append(entry)
+
+    @staticmethod
+    def _fill_names(list_elem: etree.Element, names: List[str]):
+        """Append the names list entries as <string> elements."""
+        make = list_elem.makeelement
+        for name in names:
+            entry = make("string")
+            entry.text = name
+            list_elem.append(entry)
+
+    @staticmethod
+    def _fill_offsets(list_elem: etree.Element, tensor_ref: str, total_divisor: int,
+                      count: int, explicit_offsets: Optional[List[str]]):
+        """Append the offsets list entries."""
+        if explicit_offsets:
+            # Use explicit symbolic offsets from the GUI XML (as raw const text)
+            make = list_elem.makeelement
+            for off in explicit_offsets:
+                entry = make("const")
+                entry.text = str(off).strip()
+                list_elem.append(entry)
+            return
+        # Calculate offsets as: (tensor.numel() // total_divisor) * i
+        # Everything but the index const is the same for every entry.
+        term = deepcopy(_OFFSET_TERM)
+        div_expr = term[0]
+        div_expr[0].set("ref", tensor_ref)
+        div_expr[1].text = str(total_divisor)
+        for i in range(count):
+            entry = deepcopy(term)
+            entry[1].text = str(i)
+            list_elem.append(entry)
+
+    @staticmethod
+    def _fill_tile_args(constructor: etree.Element, placement: str):
+        """Append the Tile constructor args parsed from "Tile(x, y)"."""
+        coords = _parse_tile(placement)
+        if not coords:
+            return
+        make = constructor.makeelement
+        for coord in coords:
+            arg = make("arg")
+            const = make("const")
+            const.text = coord
+            arg.append(const)
+            constructor.append(arg)
+
+    def _append_dims_kwarg(self, method: etree.Element, name: str, dims: Optional[str], count: int):
+        """Append a dims kwarg — a list of `count` references to the same dims symbol."""
+        if not dims:
+            return
+        kwarg = _SubElement(method, "kwarg", {"name": name})
+        self._fill_repeated(_SubElement(kwarg, "list"), "const", dims, count)
 
 
 class XMLTransformer:
@@ -429,122 +570,217 @@ class XMLTransformer:
 
     def __init__(self, simple_xml_path: Path):
         self.simple_xml_path = simple_xml_path
-        self.tree = etree.parse(str(simple_xml_path))
+        self.tree = etree.parse(str(simple_xml_path), _SIMPLE_XML_PARSER)
         self.root = self.tree.getroot()
 
-        # Extract symbols and function info
-        self.symbols = self._extract_symbols()
-        self.function_params = self._extract_function_params()
+        # Symbol tables, function info, the expander and the import prescans
+        # are cached properties, scanned from the tree on first use.
 
-        # Build expander and method builder
-        self.expander = ExpressionExpander(self.symbols, self.function_params)
-        self.method_builder = MethodChainBuilder(self.expander)
-
-        # Set up tensor reference mapping from JIT function parameters
-        self._setup_tensor_refs()
+        # Set by the CoreFunction transforms when they emit a range_ loop
+        self._needs_controlflow = False
 
         # Naming lookup tables
         self.objectfifo_names = {}  # simple_name → expanded_name
         self.objectfifo_types = {}  # simple_name → type_name (e.g., "of_in_a" → "memtile_ty")
-        self.type_divisors = self._extract_type_divisors()  # type_name → divisor (e.g., "memtile_ty" → 16)
         self.split_outputs = {}  # split_name → list of output names
         self.join_inputs = {}  # join_name → list of input names
-        self.function_entry_names = self._build_function_mapping()  # function_name → entry_name
 
-        # Track if we need controlflow import (for range_ loops)
-        self.needs_controlflow_import = False
-        # Track if we need TensorTiler2D import
-        self.needs_tiler2d_import = False
+        # Worker names in DataFlow order, collected by _transform_worker, and
+        # the <items> of each emitted Workers list
+        self._worker_names = []
+        self._worker_list_items = []
+
+        # DataFlow child tag → handler
+        self._dataflow_dispatch = {
+            "ExternalFunction": self._transform_external_function,
+            "CoreFunction": self._transform_core_function,
+            "ObjectFifo": self._transform_objectfifo,
+            "ObjectFifoSplit": self._transform_split,
+            "ObjectFifoJoin": self._transform_join,
+            "ObjectFifoForward": self._transform_forward,
+            "Worker": self._transform_worker,
+            "Runtime": self._transform_runtime,
+            "Program": self._transform_program,
+        }
+        # CoreFunction body statement tag → emitter
+        self._core_stmt_dispatch = {
+            "Acquire": self._emit_acquire,
+            "Release": self._emit_release,
+            "Call": self._emit_core_call,
+            "ForLoop": self._emit_for_loop,
+            "Assignment": self._emit_assignment,
+        }
+        # Function body statement tag → emitter
+        self._function_stmt_dispatch = {
+            "UseDataFlow": self._emit_use_dataflow,
+            "Return": self._emit_return,
+            "Assign": self._transform_assign,
+            "Tensor": self._transform_tensor_assign,
+            "RawLine": self._emit_rawline,
+            "Call": self._transform_call,
+        }
+
+    @cached_property
+    def _simple_symbols(self) -> Optional[etree.Element]:
+        """The <Symbols> section of the simple XML, or None."""
+        return _first(_XP_SYMBOLS(self.root))
+
+    @cached_property
+    def _simple_functions(self) -> Tuple[etree.Element, ...]:
+        """The <Function> elements of the simple XML, in order."""
+        return tuple(self.root.iterchildren("Function"))
+
+    @cached_property
+    def _symbol_tables(self) -> Tuple[Dict[str, str], Dict[str, int], Tuple[str, ...]]:
+        return self._scan_symbols()
+
+    @cached_property
+    def symbols(self) -> Dict[str, str]:
+        """Constant name → value."""
+        return self._symbol_tables[0]
+
+    @cached_property
+    def type_divisors(self) -> Dict[str, int]:
+        """Type name → divisor (e.g., "memtile_ty" → 16)."""
+        return self._symbol_tables[1]
+
+    @cached_property
+    def _type_names(self) -> Tuple[str, ...]:
+        """Names of the simple XML's TypeAbstractions, in order."""
+        return self._symbol_tables[2]
+
+    @cached_property
+    def _function_tables(self) -> Tuple[Dict[str, List[str]], Dict[str, str], List[str]]:
+        return self._scan_functions()
+
+    @cached_property
+    def function_params(self) -> Dict[str, List[str]]:
+        """Function name → parameter names."""
+        return self._function_tables[0]
+
+    @cached_property
+    def function_entry_names(self) -> Dict[str, str]:
+        """Function name → entry name."""
+        return self._function_tables[1]
+
+    @cached_property
+    def _resolve_function_name(self):
+        """Bound lookup: name → entry name, called as (name, default)."""
+        return self.function_entry_names.get
+
+    @cached_property
+    def jit_params(self) -> List[str]:
+        """Parameter names of iron.jit functions."""
+        return self._function_tables[2]
+
+    @cached_property
+    def expander(self) -> ExpressionExpander:
+        expander = ExpressionExpander(self.symbols, self.function_params)
+        # Set up tensor reference mapping from JIT function parameters
+        expander.set_tensor_refs(self._build_tensor_refs())
+        return expander
+
+    @cached_property
+    def method_builder(self) -> MethodChainBuilder:
+        return MethodChainBuilder(self.expander)
+
+    @cached_property
+    def _prescanned_controlflow(self) -> bool:
+        return self._prescan_controlflow()
+
+    @property
+    def needs_controlflow_import(self) -> bool:
+        """Whether the code needs the controlflow import (for range_ loops)."""
+        return self._needs_controlflow or self._prescanned_controlflow
 
-    def _build_function_mapping(self) -> Dict[str, str]:
-        """Build mapping of function names to entry names."""
-        mapping = {}
-        for func in self.root.findall("Function"):
+    @cached_property
+    def needs_tiler2d_import(self) -> bool:
+        """Whether the code needs the TensorTiler2D import."""
+        return self._prescan_tiler2d()
+
+    def _scan_functions(self) -> Tuple[Dict[str, List[str]], Dict[str, str], List[str]]:
+        """
+        Collect parameter lists, entry names and JIT parameters in one pass
+        over the <Function> elements.
+
+        Returns:
+            (function_params, function_entry_names, jit_params)
+        """
+        function_params = {}
+        function_entry_names = {}
+        jit_params = []
+        for func in self._simple_functions:
             name = func.get("name")
             entry = func.get("entry")
             if entry:
-                mapping[name] = entry
-        return mapping
+                function_entry_names[_intern(name)] = _intern(entry)
+            params = func.find("parameters")
+            if params is not None:
+                param_list = [p.get("name") for p in params.iterfind("param")]
+                function_params[name] = param_list
+                if func.get("decorator") == "iron.jit":
+                    jit_params.extend(param_list)
+        return function_params, function_entry_names, jit_params
 
-    def _extract_symbols(self) -> Dict[str, str]:
-        """Extract constants and type definitions from Symbols section."""
-        symbols = {}
-        symbols_section = self.root.find("Symbols")
-        if symbols_section is not None:
-            for const in symbols_section.findall("Const"):
-                name = const.get("name")
-                value = const.text.strip() if const.text else ""
-                symbols[name] = value
-        return symbols
-
-    def _extract_type_divisors(self) -> Dict[str, int]:
+    def _scan_symbols(self) -> Tuple[Dict[str, str], Dict[str, int], Tuple[str, ...]]:
         """
-        Extract divisor values from type shape expressions.
+        Collect constants, type divisors and TypeAbstraction names in one
+        pass over the Symbols section.
 
         For types like 'memtile_ty' with shape 'N / 16', extracts divisor 16.
         For types like 'tile_ty' with shape 'N / 64', extracts divisor 64.
-        Returns dict mapping type name to its divisor (1 if no division).
+        Types without a division get divisor 1.
+
+        Returns:
+            (symbols, type_divisors, type_names)
         """
+        symbols = {}
         type_divisors = {}
-        symbols_section = self.root.find("Symbols")
-        if symbols_section is not None:
-            for type_abs in symbols_section.findall("TypeAbstraction"):
-                name = type_abs.get("name")
-                ndarray = type_abs.find("ndarray")
+        type_names = []
+        if self._simple_symbols is None:
+            return symbols, type_divisors, ()
+        for child in self._simple_symbols:
+            tag = child.tag
+            if tag == "Const":
+                symbols[_intern(child.get("name"))] = child.text.strip() if child.text else ""
+            elif tag == "TypeAbstraction":
+                name = _intern(child.get("name"))
+                type_names.append(name)
+                ndarray = child.find("ndarray")
                 if ndarray is not None:
                     shape_elem = ndarray.find("shape")
                     if shape_elem is not None and shape_elem.text:
                         shape = shape_elem.text.strip()
                         # Parse shape like "N / 16" to extract divisor
-                        if "/" in shape:
-                            parts = shape.split("/")
-                            if len(parts) == 2:
-                                try:
-                                    divisor = int(parts[1].strip())
-                                    type_divisors[name] = divisor
-                                except ValueError:
-                                    type_divisors[name] = 1
-                        else:
+                        _, denominator = _parse_shape(shape)
+                        if denominator is not None:
+                            try:
+                                type_divisors[name] = int(denominator)
+                            except ValueError:
+                                type_divisors[name] = 1
+                        elif "/" not in shape:
                             # No division means full size (divisor = 1)
                             type_divisors[name] = 1
-        return type_divisors
-
-    def _extract_function_params(self) -> Dict[str, List[str]]:
-        """Extract function parameter lists."""
-        func_params = {}
-        for func in self.root.findall("Function"):
-            name = func.get("name")
-            params = func.find("parameters")
-            if params is not None:
-                param_list = [p.get("name") for p in params.findall("param")]
-                func_params[name] = param_list
-        return func_params
+        return symbols, type_divisors, tuple(type_names)
 
-    def _setup_tensor_refs(self):
+    def _build_tensor_refs(self) -> Dict[str, str]:
         """
-        Set up tensor reference mapping by analyzing JIT function parameters.
-        Looks for function with decorator="iron.jit" and extracts parameter names.
+        Build the tensor reference mapping by analyzing JIT function parameters.
+        Uses the parameter names collected by _scan_functions for functions
+        with decorator="iron.jit".
         """
         tensor_map = {}
 
-        # Find JIT function
-        for func in self.root.findall("Function"):
-            if func.get("decorator") == "iron.jit":
-                params = func.find("parameters")
-                if params is not None:
-                    param_list = params.findall("param")
-                    # Map based on parameter position/naming convention
-                    # Common patterns: inputA, inputB, outputC, outputD, etc.
-                    for param in param_list:
-                        param_name = param.get("name")
-                        if param_name:
-                            # Extract letter (A, B, C, D) from parameter name
-                            match = re.search(r'([A-Z])$', param_name)
-                            if match:
-                                letter = match.group(1)
-                                tensor_map[letter] = param_name
-
-        self.expander.set_tensor_refs(tensor_map)
+        # Map based on parameter position/naming convention
+        # Common patterns: inputA, inputB, outputC, outputD, etc.
+        for param_name in self.jit_params:
+            if param_name:
+                # Extract trailing letter (A, B, C, D) from parameter name
+                letter = param_name[-1]
+                if "A" <= letter <= "Z":
+                    tensor_map[sys.intern(letter)] = sys.intern(param_name)
+
+        return tensor_map
 
     def transform(self) -> etree.Element:
         """
@@ -554,50 +790,122 @@ class XMLTransformer:
             Complete XML root element ready for GraphDriver
         """
         # Create new complete XML structure
-        complete_root = etree.Element("Module", name=self.root.get("name"))
-
-        # Pre-scan for features that require imports
-        self._prescan_for_imports()
+        complete_root = _Element("Module", name=self.root.get("name"))
 
         # Transform each section
-        self._transform_symbols(complete_root)
-        self._transform_dataflow(complete_root)
-        self._transform_functions(complete_root)
-        self._transform_entrypoint(complete_root)
+        for _ in self._iter_sections(complete_root):
+            pass
 
         return complete_root
 
-    def _prescan_for_imports(self):
-        """Pre-scan the XML to determine which imports are needed."""
-        # Check for CoreFunctions with loop_count or nested ForLoop elements
-        dataflow = self.root.find("DataFlow")
-        if dataflow is not None:
-            for core_func in dataflow.findall("CoreFunction"):
-                if core_func.get("loop_count"):
-                    self.needs_controlflow_import = True
-                    break
-                # Check for nested ForLoop elements in body
-                body = core_func.find("body")
-                if body is not None:
-                    if body.find(".//ForLoop") is not None:
-                        self.needs_controlflow_import = True
+    def transform_to_file(self, output_path: Path):
+        """
+        Transform simplified XML and stream the complete XML to a file.
+
+        Produces the same document as save(), but elements are serialized and
+        dropped as soon as _iter_sections reports them final, so the complete
+        tree never has to be held in memory at once.
+        """
+        module = _Element("Module", name=self.root.get("name"))
+        steps = self._iter_sections(module)
+
+        with open(output_path, "wb") as out:
+            with etree.xmlfile(out, encoding="UTF-8") as xf:
+                xf.write_declaration()
+                # Run up to the first emitted section; a Module without any
+                # is written self-closed, as pretty_print does
+                for ready in steps:
+                    if len(module):
                         break
+                if not len(module):
+                    xf.write(module)
+                else:
+                    with xf.element("Module", module.attrib):
+                        self._write_sections(xf, module, chain((ready,), steps))
+                        xf.write("\n")
+            out.write(b"\n")
+
+    def _iter_sections(self, module: etree.Element):
+        """
+        Transform the top-level sections into module, in document order.
+
+        Yields the element whose children built so far are final: module
+        once a whole section (or Function) is complete, or a section that is
+        still being built. transform() just drains it; transform_to_file()
+        writes out and drops the final children at every step.
+        """
+        self._transform_symbols(module)
+        yield module
 
-        # Check for TensorTiler2D specs in Symbols
-        simple_symbols = self.root.find("Symbols")
+        yield from self._iter_dataflow(module)
+        yield module
+
+        for func in self._simple_functions:
+            self._transform_function(func, module)
+            yield module
+
+        self._transform_entrypoint(module)
+        yield module
+
+    def _write_sections(self, xf, module: etree.Element, steps):
+        """Write module's children to xf as the _iter_sections steps finalize them."""
+        for ready in steps:
+            if ready is not module:
+                if not len(ready):
+                    continue
+                # A section still being built: open its element and stream
+                # its children until the section is complete
+                xf.write("\n  ")
+                with xf.element(ready.tag, ready.attrib):
+                    self._write_children(xf, ready, 2)
+                    for step in steps:
+                        if step is module:
+                            break
+                        self._write_children(xf, ready, 2)
+                    self._write_children(xf, ready, 2)
+                    xf.write("\n  ")
+                module.remove(ready)
+            self._write_children(xf, module, 1)
+
+    @staticmethod
+    def _write_children(xf, holder: etree.Element, level: int):
+        """Detach holder's children and write them to xf, indented as pretty_print would at `level`."""
+        indent = "\n" + "  " * level
+        for child in list(holder):
+            holder.remove(child)
+            etree.indent(child, level=level)
+            xf.write(indent, child)
+
+    def _prescan_controlflow(self) -> bool:
+        """Check for CoreFunctions with loop_count or nested ForLoop elements."""
+        dataflow = _first(_XP_DATAFLOW(self.root))
+        if dataflow is None:
+            return False
+        if _XP_LOOPED_COREFUNC(dataflow):
+            return True
+        for core_func in dataflow.iterfind("CoreFunction"):
+            # Check for nested ForLoop elements in body
+            body = core_func.find("body")
+            if body is not None and body.find(".//ForLoop") is not None:
+                return True
+        return False
+
+    def _prescan_tiler2d(self) -> bool:
+        """Check for TensorTiler2D specs in Symbols."""
+        simple_symbols = self._simple_symbols
         if simple_symbols is not None:
             for child in simple_symbols:
                 if child.tag == "TensorTiler2D":
-                    self.needs_tiler2d_import = True
-                    break
+                    return True
+        return False
 
     def _transform_symbols(self, parent: etree.Element):
         """Transform Symbols section with expanded type expressions."""
-        simple_symbols = self.root.find("Symbols")
+        simple_symbols = self._simple_symbols
         if simple_symbols is None:
             return
 
-        symbols_section = etree.SubElement(parent, "Symbols")
+        symbols_section = _SubElement(parent, "Symbols")
 
         # Add standard imports first
         self._add_imports(symbols_section)
@@ -605,9 +913,9 @@ class XMLTransformer:
         # Copy constants
         for child in simple_symbols:
             if child.tag == "Const":
-                const = etree.SubElement(symbols_section, "Const",
-                                       name=child.get("name"),
-                                       type=child.get("type", "int"))
+                const = symbols_section.makeelement(
+                    "Const", {"name": child.get("name"), "type": child.get("type", "int")})
+                symbols_section.append(const)
                 const.text = child.text
 
             elif child.tag == "TypeDef":
@@ -635,32 +943,32 @@ class XMLTransformer:
         ]
 
         for module, alias in imports:
-            import_elem = etree.SubElement(parent, "Import", name=module)
+            import_elem = _SubElement(parent, "Import", name=module)
             if alias:
                 import_elem.set("alias", alias)
 
         # Add aie.iron with submodules
-        iron_import = etree.SubElement(parent, "Import", name="aie.iron", alias="iron")
+        iron_import = _SubElement(parent, "Import", name="aie.iron", alias="iron")
         submodules = ["Program", "Runtime", "Worker", "ObjectFifo",
                      "SequentialPlacer", "AnyComputeTile", "Tile",
                      "ExternalFunction", "jit", "dataflow"]
         for sub in submodules:
-            sub_elem = etree.SubElement(iron_import, "Submodule", name=sub)
+            sub_elem = _SubElement(iron_import, "Submodule", name=sub)
 
         functions = ["get_current_device", "arange", "zeros"]
         for func in functions:
-            func_elem = etree.SubElement(iron_import, "Function", name=func)
+            func_elem = _SubElement(iron_import, "Function", name=func)
 
         # Add taplib imports
-        taplib_import = etree.SubElement(parent, "Import", name="aie.helpers.taplib")
-        sub_elem = etree.SubElement(taplib_import, "Submodule", name="TensorAccessPattern")
+        taplib_import = _SubElement(parent, "Import", name="aie.helpers.taplib")
+        sub_elem = _SubElement(taplib_import, "Submodule", name="TensorAccessPattern")
         if self.needs_tiler2d_import:
-            sub_elem2 = etree.SubElement(taplib_import, "Submodule", name="TensorTiler2D")
+            sub_elem2 = _SubElement(taplib_import, "Submodule", name="TensorTiler2D")
 
         # Add controlflow import if needed (for range_ loops)
         if self.needs_controlflow_import:
-            controlflow_import = etree.SubElement(parent, "Import", name="aie.iron.controlflow")
-            sub_elem = etree.SubElement(controlflow_import, "Submodule", name="range_")
+            controlflow_import = _SubElement(parent, "Import", name="aie.iron.controlflow")
+            sub_elem = _SubElement(controlflow_import, "Submodule", name="range_")
 
     def _transform_type_abstraction(self, simple_type: etree.Element, parent: etree.Element):
         """Transform TypeAbstraction with expanded expressions.
@@ -672,43 +980,43 @@ class XMLTransformer:
         """
         name = simple_type.get("name")
 
-        type_abs = etree.SubElement(parent, "TypeAbstraction", name=name)
+        type_abs = parent.makeelement("TypeAbstraction", {"name": name})
+        parent.append(type_abs)
 
         # Process ndarray structure
         ndarray = simple_type.find("ndarray")
         if ndarray is not None:
-            ndarray_elem = etree.SubElement(type_abs, "ndarray")
+            ndarray_elem = _SubElement(type_abs, "ndarray")
 
             # Transform shape
             shape = ndarray.find("shape")
             if shape is not None:
-                shape_elem = etree.SubElement(ndarray_elem, "shape")
+                shape_elem = _SubElement(ndarray_elem, "shape")
                 shape_text = shape.text.strip() if shape.text else ""
 
                 # Split by comma for multi-dimensional shapes
                 dims = [d.strip() for d in shape_text.split(",") if d.strip()]
 
-                tensor_refs = self.expander.tensor_refs
-                tensor_ref = next(iter(tensor_refs.values())) if tensor_refs else "input"
+                tensor_ref = self.expander.primary_tensor_ref
 
                 for dim in dims:
-                    tuple_elem = etree.SubElement(shape_elem, "tuple")
-                    expr_elem = etree.SubElement(tuple_elem, "expr")
+                    tuple_elem = _SubElement(shape_elem, "tuple")
+                    expr_elem = _SubElement(tuple_elem, "expr")
 
                     # Determine if this is a data_size pattern (legacy) or symbolic
                     is_data_size = "data_size" in dim
                     if is_data_size and tensor_ref:
                         # data_size / N → numel() // N
-                        if "/" in dim:
-                            parts = dim.split("/")
-                            denominator = parts[1].strip()
-                            binary_op = etree.SubElement(expr_elem, "binary_op", op="//")
-                            etree.SubElement(binary_op, "method", ref=tensor_ref, name="numel")
-                            const_elem = etree.SubElement(binary_op, "const")
+                        _, sep, rest = dim.partition("/")
+                        if sep:
+                            denominator = rest.partition("/")[0].strip()
+                            binary_op = _SubElement(expr_elem, "binary_op", op="//")
+                            _SubElement(binary_op, "method", ref=tensor_ref, name="numel")
+                            const_elem = _SubElement(binary_op, "const")
                             const_elem.text = denominator
                         else:
                             # data_size → numel()
-                            etree.SubElement(expr_elem, "method", ref=tensor_ref, name="numel")
+                            _SubElement(expr_elem, "method", ref=tensor_ref, name="numel")
                     else:
                         # Symbolic expression — keep as raw text.
                         # Constants will be defined as local variables in the jit function.
@@ -718,8 +1026,8 @@ class XMLTransformer:
             # Transform dtype
             dtype = ndarray.find("dtype")
             if dtype is not None:
-                dtype_elem = etree.SubElement(ndarray_elem, "dtype")
-                numpy_dtype = etree.SubElement(dtype_elem, "numpy_dtype")
+                dtype_elem = _SubElement(ndarray_elem, "dtype")
+                numpy_dtype = _SubElement(dtype_elem, "numpy_dtype")
                 numpy_dtype.text = dtype.text.strip() if dtype.text else "bfloat16"
 
     def _auto_generate_type_variations(self, simple_symbols: etree.Element, symbols_section: etree.Element):
@@ -744,13 +1052,12 @@ class XMLTransformer:
 
         if not has_specific_types and (has_generic_data or has_generic_chunk or has_generic_worker_chunk):
             # Get tensor references from function parameters
-            tensor_refs = self.expander.tensor_refs
-
-            if not tensor_refs:
+            sorted_tensor_refs = self.expander.sorted_tensor_refs
+            if not sorted_tensor_refs:
                 return
 
             # For each tensor, create specific type variations
-            for letter, param_name in sorted(tensor_refs.items()):
+            for letter, param_name in sorted_tensor_refs:
                 letter_lower = letter.lower()
 
                 # Generate data_X_ty (full tensor type)
@@ -786,119 +1093,108 @@ class XMLTransformer:
     def _generate_type_variation(self, parent: etree.Element, type_name: str,
                                  tensor_ref: str, divisor: str, dtype_str: str):
         """Generate a single type variation."""
-        type_abs = etree.SubElement(parent, "TypeAbstraction", name=type_name)
-        ndarray_elem = etree.SubElement(type_abs, "ndarray")
-
-        # Shape
-        shape_elem = etree.SubElement(ndarray_elem, "shape")
-        tuple_elem = etree.SubElement(shape_elem, "tuple")
-        expr_elem = etree.SubElement(tuple_elem, "expr")
-
         if divisor == "1":
-            # Just tensor.numel()
-            method_elem = etree.SubElement(expr_elem, "method", ref=tensor_ref, name="numel")
+            type_abs = deepcopy(_TYPE_VARIATION_NUMEL)
+        else:
+            type_abs = deepcopy(_TYPE_VARIATION_DIV)
+        type_abs.set("name", type_name)
+        ndarray = type_abs[0]
+        # ndarray/shape/tuple/expr → method, or binary_op(method, const)
+        shape_expr = ndarray[0][0][0][0]
+        if divisor == "1":
+            shape_expr.set("ref", tensor_ref)
         else:
-            # tensor.numel() // divisor
-            binary_op = etree.SubElement(expr_elem, "binary_op", op="//")
-            method_elem = etree.SubElement(binary_op, "method", ref=tensor_ref, name="numel")
-            const_elem = etree.SubElement(binary_op, "const")
-            const_elem.text = divisor
-
-        # Dtype
-        dtype_elem = etree.SubElement(ndarray_elem, "dtype")
-        numpy_dtype = etree.SubElement(dtype_elem, "numpy_dtype")
-        numpy_dtype.text = dtype_str
-
-    def _transform_dataflow(self, parent: etree.Element):
-        """Transform DataFlow section with expanded ObjectFifos, Workers, Runtime."""
-        simple_dataflow = self.root.find("DataFlow")
+            shape_expr[0].set("ref", tensor_ref)
+            shape_expr[1].text = divisor
+        # ndarray/dtype/numpy_dtype
+        ndarray[1][0].text = dtype_str
+        parent.append(type_abs)
+
+    def _iter_dataflow(self, parent: etree.Element):
+        """
+        Transform the DataFlow section into parent, child by child.
+
+        Yields the DataFlow section whenever the children built so far are
+        final (see _iter_sections).
+        """
+        simple_dataflow = _first(_XP_DATAFLOW(self.root))
         if simple_dataflow is None:
             return
 
-        dataflow_section = etree.SubElement(parent, "DataFlow")
+        dataflow_section = _SubElement(parent, "DataFlow")
+        self._worker_names = []
+        self._worker_list_items = []
 
         # Process elements in order
-        for child in simple_dataflow:
-            tag = child.tag
-
-            if tag == "ExternalFunction":
-                self._transform_external_function(child, dataflow_section)
-            elif tag == "CoreFunction":
-                self._transform_core_function(child, dataflow_section)
-            elif tag == "ObjectFifo":
-                self._transform_objectfifo(child, dataflow_section)
-            elif tag == "ObjectFifoSplit":
-                self._transform_split(child, dataflow_section)
-            elif tag == "ObjectFifoJoin":
-                self._transform_join(child, dataflow_section)
-            elif tag == "ObjectFifoForward":
-                self._transform_forward(child, dataflow_section)
-            elif tag == "Worker":
-                self._transform_worker(child, dataflow_section)
-            elif tag == "Runtime":
-                self._transform_runtime(child, dataflow_section)
-            elif tag == "Program":
-                self._transform_program(child, dataflow_section)
+        dispatch = self._dataflow_dispatch.get
+        for child in simple_dataflow.iterchildren():
+            handler = dispatch(child.tag)
+            if handler is not None:
+                handler(child, dataflow_section)
+                # Once a Runtime is built its Workers list still gains the
+                # Workers declared after it, so nothing more is final
+                if not self._worker_list_items:
+                    yield dataflow_section
 
     def _transform_external_function(self, simple_func: etree.Element, parent: etree.Element):
         """Transform ExternalFunction with proper structure."""
         name = simple_func.get("name")
 
-        ext_func = etree.SubElement(parent, "ExternalFunction", name=name)
-        attributes = etree.SubElement(ext_func, "attributes")
+        ext_func = _SubElement(parent, "ExternalFunction", attrib={"name": name})
+        attributes = _SubElement(ext_func, "attributes")
 
         # kernel name
         kernel = simple_func.find("kernel")
         if kernel is not None:
-            kwarg = etree.SubElement(attributes, "kwarg", name="name", value=kernel.text.strip())
+            _SubElement(attributes, "kwarg",
+                        attrib={"name": "name", "value": kernel.text.strip()})
 
         # source file
         source = simple_func.find("source")
         if source is not None:
-            kwarg = etree.SubElement(attributes, "kwarg", name="source_file", value=source.text.strip())
+            _SubElement(attributes, "kwarg",
+                        attrib={"name": "source_file", "value": source.text.strip()})
 
         # arg_types
         arg_types = simple_func.find("arg_types")
         if arg_types is not None:
-            kwarg = etree.SubElement(attributes, "kwarg", name="arg_types")
-            type_list = etree.SubElement(kwarg, "list")
-            for type_elem in arg_types.findall("type"):
-                type_ref = etree.SubElement(type_list, "type_ref")
-                type_ref.text = type_elem.text.strip()
+            kwarg = _SubElement(attributes, "kwarg", attrib={"name": "arg_types"})
+            type_list = _SubElement(kwarg, "list")
+            for type_elem in arg_types.iterchildren("type"):
+                _SubElement(type_list, "type_ref").text = type_elem.text.strip()
 
         # include_dirs (read from GUI XML if present)
         include_dirs_elem = simple_func.find("include_dirs")
         if include_dirs_elem is not None:
-            kwarg_include = etree.SubElement(attributes, "kwarg", name="include_dirs")
-            include_list = etree.SubElement(kwarg_include, "list")
-            for dir_elem in include_dirs_elem.findall("dir"):
-                string_elem = etree.SubElement(include_list, "string")
-                string_elem.text = dir_elem.text.strip() if dir_elem.text else ""
+            kwarg_include = _SubElement(attributes, "kwarg", attrib={"name": "include_dirs"})
+            include_list = _SubElement(kwarg_include, "list")
+            for dir_elem in include_dirs_elem.iterchildren("dir"):
+                _SubElement(include_list, "string").text = dir_elem.text.strip() if dir_elem.text else ""
 
     def _transform_core_function(self, simple_func: etree.Element, parent: etree.Element):
         """Transform CoreFunction with full body, including optional loop wrapper."""
         name = simple_func.get("name")
         loop_count = simple_func.get("loop_count")
 
-        core_func = etree.SubElement(parent, "CoreFunction", name=name)
+        core_func = _SubElement(parent, "CoreFunction", name=name)
 
         # Parameters
-        params_section = etree.SubElement(core_func, "parameters")
+        params_section = _SubElement(core_func, "parameters")
         params = simple_func.find("parameters")
         if params is not None:
-            for param in params.findall("param"):
-                param_elem = etree.SubElement(params_section, "param", name=param.get("name"))
+            for param in params.iterchildren("param"):
+                param_elem = _SubElement(params_section, "param", name=param.get("name"))
 
         # Body
-        body_section = etree.SubElement(core_func, "body")
+        body_section = _SubElement(core_func, "body")
 
         # If loop_count is specified, wrap body in a For loop
         if loop_count:
-            self.needs_controlflow_import = True
+            self._needs_controlflow = True
             # Expand the loop_count expression
             expanded_loop_count = self.expander.expand_shape_expression(loop_count)
             # Create For element with range_(loop_count)
-            for_elem = etree.SubElement(body_section, "For", var="_")
+            for_elem = _SubElement(body_section, "For", var="_")
             for_elem.set("range", f"range_({expanded_loop_count})")
             # Statements go inside the For element
             stmt_parent = for_elem
@@ -917,53 +1213,59 @@ class XMLTransformer:
         Handles: Acquire, Release, Call, ForLoop, Assignment
         Supports nested ForLoop recursively for patterns like matrix_vector_mul.
         """
+        dispatch = self._core_stmt_dispatch.get
         for stmt in stmts_elem:
-            if stmt.tag == "Acquire":
-                acquire = etree.SubElement(parent, "Acquire", name=stmt.get("name"))
-                call = etree.SubElement(acquire, "call")
-                method = etree.SubElement(call, "method", ref=stmt.get("source"), name="acquire")
-                arg = etree.SubElement(method, "arg")
-                const = etree.SubElement(arg, "const")
-                const.text = stmt.get("count", "1")
-
-            elif stmt.tag == "Call":
-                call = etree.SubElement(parent, "Call")
-                func = etree.SubElement(call, "function", ref=stmt.get("function"))
-                args_text = stmt.get("args", "")
-                for arg_name in args_text.split(","):
-                    arg_name = arg_name.strip()
-                    if arg_name:
-                        arg = etree.SubElement(func, "arg")
-                        var = etree.SubElement(arg, "var", ref=arg_name)
-
-            elif stmt.tag == "Release":
-                release = etree.SubElement(parent, "Release")
-                call = etree.SubElement(release, "call")
-                method = etree.SubElement(call, "method", ref=stmt.get("source"), name="release")
-                arg = etree.SubElement(method, "arg")
-                const = etree.SubElement(arg, "const")
-                const.text = stmt.get("count", "1")
-
-            elif stmt.tag == "ForLoop":
-                # Nested for loop: for <var> in range_(<count>)
-                self.needs_controlflow_import = True
-                var_name = stmt.get("var", "_")
-                count_expr = stmt.get("count", "1")
-                expanded_count = self.expander.expand_shape_expression(count_expr)
-                for_elem = etree.SubElement(parent, "For", var=var_name)
-                for_elem.set("range", f"range_({expanded_count})")
-                # Recursively process the nested body
-                self._transform_core_body_stmts(stmt, for_elem)
-
-            elif stmt.tag == "Assignment":
-                # Indexed assignment: target[index] = value
-                target = stmt.get("target", "")
-                index = stmt.get("index", "")
-                value = stmt.get("value", "0")
-                assign_elem = etree.SubElement(parent, "Assignment")
-                assign_elem.set("target", target)
-                assign_elem.set("index", index)
-                assign_elem.set("value", value)
+            emit = dispatch(stmt.tag)
+            if emit is not None:
+                emit(stmt, parent)
+
+    @staticmethod
+    def _emit_acquire_release(acq_rel: etree.Element, stmt: etree.Element, method_name: str):
+        """Fill an Acquire/Release node with its <source>.<method_name>(<count>) call."""
+        call = _SubElement(acq_rel, "call")
+        method = _SubElement(call, "method", ref=stmt.get("source"), name=method_name)
+        arg = _SubElement(method, "arg")
+        const = _SubElement(arg, "const")
+        const.text = stmt.get("count", "1")
+
+    def _emit_acquire(self, stmt: etree.Element, parent: etree.Element):
+        """Emit Acquire: <source>.acquire(<count>)."""
+        acquire = _SubElement(parent, "Acquire", name=stmt.get("name"))
+        self._emit_acquire_release(acquire, stmt, "acquire")
+
+    def _emit_release(self, stmt: etree.Element, parent: etree.Element):
+        """Emit Release: <source>.release(<count>)."""
+        release = _SubElement(parent, "Release")
+        self._emit_acquire_release(release, stmt, "release")
+
+    def _emit_core_call(self, stmt: etree.Element, parent: etree.Element):
+        """Emit a kernel Call with variable args."""
+        call = _SubElement(parent, "Call")
+        func = _SubElement(call, "function", ref=stmt.get("function"))
+        for arg_name in _LIST_ITEM_RE.findall(stmt.get("args", "")):
+            arg = _SubElement(func, "arg")
+            var = _SubElement(arg, "var", ref=arg_name)
+
+    def _emit_for_loop(self, stmt: etree.Element, parent: etree.Element):
+        """Emit a nested for loop: for <var> in range_(<count>)."""
+        self._needs_controlflow = True
+        var_name = stmt.get("var", "_")
+        count_expr = stmt.get("count", "1")
+        expanded_count = self.expander.expand_shape_expression(count_expr)
+        for_elem = _SubElement(parent, "For", var=var_name)
+        for_elem.set("range", f"range_({expanded_count})")
+        # Recursively process the nested body
+        self._transform_core_body_stmts(stmt, for_elem)
+
+    def _emit_assignment(self, stmt: etree.Element, parent: etree.Element):
+        """Emit an indexed assignment: target[index] = value."""
+        target = stmt.get("target", "")
+        index = stmt.get("index", "")
+        value = stmt.get("value", "0")
+        assign_elem = _SubElement(parent, "Assignment")
+        assign_elem.set("target", target)
+        assign_elem.set("index", index)
+        assign_elem.set("value", value)
 
     def _transform_tiler2d(self, simple_tiler: etree.Element, parent: etree.Element):
         """
@@ -992,7 +1294,7 @@ class XMLTransformer:
         tile_counts = expand_dim_list(tile_counts_text)
 
         # Emit as a TensorTiler2D node: name = TensorTiler2D.group_tiler(...)[index]
-        tiler_node = etree.SubElement(parent, "TensorTiler2D")
+        tiler_node = _SubElement(parent, "TensorTiler2D")
         tiler_node.set("name", name)
 
         # Store expanded parameters as attributes for CodeGenerator to use
@@ -1045,7 +1347,7 @@ class XMLTransformer:
 
         if not use_tiler2d:
             # Emit as a TensorAccessPattern node: name = TensorAccessPattern(tensor_dims, offset, sizes, strides)
-            tap_node = etree.SubElement(parent, "TensorAccessPattern")
+            tap_node = _SubElement(parent, "TensorAccessPattern")
             tap_node.set("name", name)
             tap_node.set("offset", str(expanded_offset))
             tap_node.set("tensor_dims", ", ".join(tensor_dims))
@@ -1078,7 +1380,7 @@ class XMLTransformer:
             tile_counts.append(f"{tensor_dim} // {tile_dim}")
 
         # Emit as a TensorTiler2D node: name = TensorTiler2D.group_tiler(...)[index]
-        tiler_node = etree.SubElement(parent, "TensorTiler2D")
+        tiler_node = _SubElement(parent, "TensorTiler2D")
         tiler_node.set("name", name)
 
         # Store expanded parameters as attributes for CodeGenerator to use
@@ -1095,43 +1397,48 @@ class XMLTransformer:
     def _transform_objectfifo(self, simple_of: etree.Element, parent: etree.Element):
         """Transform ObjectFifo with generated name based on context."""
         simple_name = simple_of.get("name")
-        attrs = dict(simple_of.attrib)
+        attrs = simple_of.attrib
+        context = attrs.get("context")
 
         # Generate full name based on context attributes
         # If no context, use the simple name as-is
-        if "context" in attrs:
+        if context is not None:
             expanded_name = NamingConventions.generate_objectfifo_name(attrs)
         else:
             expanded_name = simple_name
         self.objectfifo_names[simple_name] = expanded_name
 
         # Store the FIFO's type for offset calculations in split/join
-        fifo_type = simple_of.find("type").text.strip() if simple_of.find("type") is not None else "data_ty"
+        type_node = simple_of.find("type")
+        fifo_type = type_node.text.strip() if type_node is not None else "data_ty"
         self.objectfifo_types[simple_name] = fifo_type
 
         # Create ObjectFifo element
-        obj_fifo = etree.SubElement(parent, "ObjectFifo", name=expanded_name)
-        obj_type = etree.SubElement(obj_fifo, "obj_type")
-        type_ref = etree.SubElement(obj_type, "type_ref")
+        obj_fifo = _SubElement(parent, "ObjectFifo", name=expanded_name)
+        obj_type = _SubElement(obj_fifo, "obj_type")
+        type_ref = _SubElement(obj_type, "type_ref")
 
         # Map generic type to tensor-specific type
-        generic_type = simple_of.find("type").text.strip()
-        specific_type = self._map_to_specific_type(generic_type, attrs.get("data", ""), attrs.get("context", ""))
-        type_ref.text = specific_type
+        type_ref.text = self._map_to_specific_type(fifo_type, attrs.get("data", ""), context or "")
 
         # Add attributes
-        attributes = etree.SubElement(obj_fifo, "attributes")
+        attributes = _SubElement(obj_fifo, "attributes")
 
         depth = simple_of.find("depth")
         if depth is not None:
-            kwarg = etree.SubElement(attributes, "kwarg", name="depth", value=depth.text.strip())
+            kwarg = _SubElement(attributes, "kwarg", name="depth", value=depth.text.strip())
 
-        kwarg_name = etree.SubElement(attributes, "kwarg", name="name", value=expanded_name)
+        kwarg_name = _SubElement(attributes, "kwarg", name="name", value=expanded_name)
 
-    def _map_to_specific_type(self, generic_type: str, data: str, context: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _map_to_specific_type(generic_type: str, data: str, context: str) -> str:
         """
         Map generic type name to tensor-specific type name.
 
+        Only a handful of (type, data) pairs occur in a design, so results
+        are cached.
+
         Args:
             generic_type: Generic type like 'chunk_ty' or 'worker_chunk_ty'
             data: Data identifier like 'A', 'B', 'D'
@@ -1162,7 +1469,8 @@ class XMLTransformer:
         generic_output_type = simple_split.find("output_type").text.strip()
         placement = simple_split.find("placement").text.strip()
         dims_to_stream = simple_split.get("dims_to_stream", "")
-        attrs = dict(simple_split.attrib)
+        attrs = simple_split.attrib
+        context = attrs.get("context", "")
 
         # Get expanded source name
         expanded_source = self.objectfifo_names.get(source_name, source_name)
@@ -1174,7 +1482,7 @@ class XMLTransformer:
 
         # Map generic type to specific type
         specific_output_type = self._map_to_specific_type(
-            generic_output_type, attrs.get("data", ""), attrs.get("context", "")
+            generic_output_type, attrs.get("data", ""), context
         )
 
         # Generate output names
@@ -1183,8 +1491,9 @@ class XMLTransformer:
 
         # Generate split name from context; fall back to the HLIR operation name
         # when there is no context metadata (e.g. GUI-generated designs).
-        split_name = NamingConventions.generate_objectfifo_name(attrs, num_outputs)
-        if not attrs.get("context"):
+        if context:
+            split_name = NamingConventions.generate_objectfifo_name(attrs, num_outputs)
+        else:
             split_name = simple_name
 
         # Check for explicit offsets in the GUI XML
@@ -1213,7 +1522,8 @@ class XMLTransformer:
         generic_input_type = simple_join.find("input_type").text.strip()
         placement = simple_join.find("placement").text.strip()
         dims_from_stream = simple_join.get("dims_from_stream", "")
-        attrs = dict(simple_join.attrib)
+        attrs = simple_join.attrib
+        context = attrs.get("context", "")
 
         # Get expanded dest name
         expanded_dest = self.objectfifo_names.get(dest_name, dest_name)
@@ -1225,7 +1535,7 @@ class XMLTransformer:
 
         # Map generic type to specific type
         specific_input_type = self._map_to_specific_type(
-            generic_input_type, attrs.get("data", ""), attrs.get("context", "")
+            generic_input_type, attrs.get("data", ""), context
         )
 
         # Generate input names
@@ -1234,8 +1544,9 @@ class XMLTransformer:
 
         # Generate join name from context; fall back to the HLIR operation name
         # when there is no context metadata (e.g. GUI-generated designs).
-        join_name = NamingConventions.generate_objectfifo_name(attrs, num_inputs)
-        if not attrs.get("context"):
+        if context:
+            join_name = NamingConventions.generate_objectfifo_name(attrs, num_inputs)
+        else:
             join_name = simple_name
 
         # Check for explicit offsets in the GUI XML
@@ -1267,137 +1578,138 @@ class XMLTransformer:
         expanded_source = self.objectfifo_names.get(source_name, source_name)
 
         # Build method chain: source.cons(dims_from_stream=X).forward(dims_to_stream=Y, placement=Tile(x, y))
-        obj_fifo = etree.Element("ObjectFifo")
-        source_elem = etree.SubElement(obj_fifo, "source")
-        method_chain = etree.SubElement(source_elem, "method_chain")
+        obj_fifo = _SubElement(parent, "ObjectFifo", name=simple_name)
+        source_elem = _SubElement(obj_fifo, "source")
+        method_chain = _SubElement(source_elem, "method_chain")
 
         # Base: reference to source ObjectFifo
-        base = etree.SubElement(method_chain, "base")
-        var = etree.SubElement(base, "var", ref=expanded_source)
+        base = _SubElement(method_chain, "base")
+        var = _SubElement(base, "var", ref=expanded_source)
 
         # Call: .cons(dims_from_stream=<value>) — kwarg only present when dims_from_stream is set
-        call_cons = etree.SubElement(method_chain, "call")
-        method_cons = etree.SubElement(call_cons, "method", name="cons")
+        call_cons = _SubElement(method_chain, "call")
+        method_cons = _SubElement(call_cons, "method", name="cons")
         if dims_from_stream:
-            etree.SubElement(call_cons, "kwarg", name="dims_from_stream", value=dims_from_stream)
+            _SubElement(call_cons, "kwarg", name="dims_from_stream", value=dims_from_stream)
 
         # Call: .forward(placement=Tile(x, y), dims_to_stream=<value>)
-        call_forward = etree.SubElement(method_chain, "call")
-        method_forward = etree.SubElement(call_forward, "method", name="forward")
+        call_forward = _SubElement(method_chain, "call")
+        method_forward = _SubElement(call_forward, "method", name="forward")
 
         # Add placement kwarg if present
         placement_str = simple_forward.get("placement")
         if placement_str:
-            match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement_str)
-            if match:
-                kwarg_placement = etree.SubElement(call_forward, "kwarg", name="placement")
-                constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
-                arg_x = etree.SubElement(constructor, "arg")
-                const_x = etree.SubElement(arg_x, "const")
-                const_x.text = match.group(1)
-                arg_y = etree.SubElement(constructor, "arg")
-                const_y = etree.SubElement(arg_y, "const")
-                const_y.text = match.group(2)
+            if _parse_tile(placement_str):
+                kwarg_placement = _SubElement(call_forward, "kwarg", attrib=_PLACEMENT_KWARG_ATTRIB)
+                self._emit_tile_constructor(kwarg_placement, placement_str)
 
         # Add dims_to_stream kwarg on .forward() if present
         if dims_to_stream:
-            etree.SubElement(call_forward, "kwarg", name="dims_to_stream", value=dims_to_stream)
-
-        # Set the name to match simple name
-        obj_fifo.set("name", simple_name)
+            _SubElement(call_forward, "kwarg", name="dims_to_stream", value=dims_to_stream)
 
-        parent.append(obj_fifo)
         self.objectfifo_names[simple_name] = simple_name
 
     def _transform_worker(self, simple_worker: etree.Element, parent: etree.Element):
         """Transform Worker with full argument paths."""
         name = simple_worker.get("name")
-        attrs = dict(simple_worker.attrib)
 
         # Use provided name or generate from context
         # The simple XML should already have meaningful worker names
-        worker = etree.SubElement(parent, "Worker", name=name)
+        worker = _SubElement(parent, "Worker", name=name)
+        self._worker_names.append(name)
+        # Workers after the Runtime still belong in its Workers list
+        for items in self._worker_list_items:
+            _SubElement(items, "var", ref=name)
 
         # core_fn
         core_fn = simple_worker.find("core_function").text.strip()
-        core_fn_elem = etree.SubElement(worker, "core_fn", ref=core_fn)
+        core_fn_elem = _SubElement(worker, "core_fn", ref=core_fn)
 
         # fn_args
-        fn_args = etree.SubElement(worker, "fn_args")
+        fn_args = _SubElement(worker, "fn_args")
         arguments = simple_worker.find("arguments")
 
-        for arg in arguments.findall("arg"):
+        # Locals for the per-argument loop
+        sub_element = _SubElement
+        expand_name = self.objectfifo_names.get
+
+        for arg in arguments.iterchildren("arg"):
             arg_ref = arg.get("ref")
             index = arg.get("index")
             mode = arg.get("mode")
 
-            arg_elem = etree.SubElement(fn_args, "arg")
+            arg_elem = sub_element(fn_args, "arg")
+
+            has_index = index is not None
+            has_mode = mode is not None
 
             # If it references something simple (external function or direct ObjectFifo)
-            if index is None and mode is None:
+            if not has_index and not has_mode:
                 # Direct reference (likely external function)
-                var = etree.SubElement(arg_elem, "var", ref=arg_ref)
+                var = sub_element(arg_elem, "var", ref=arg_ref)
+                continue
 
-            # If it's a split/join with index
-            elif index is not None:
-                # Build indexing with method chain
-                method_chain = etree.SubElement(arg_elem, "method_chain")
+            # .cons() or .prod() for both method-chain forms
+            method_attrib = _CONS_METHOD_ATTRIB if mode == "consumer" else _PROD_METHOD_ATTRIB
+            method_chain = sub_element(arg_elem, "method_chain")
+            base = sub_element(method_chain, "base")
+            expanded_ref = expand_name(arg_ref, arg_ref)
 
+            # If it's a split/join with index
+            if has_index:
                 # Base: index into split/join array
-                base = etree.SubElement(method_chain, "base")
-                index_elem = etree.SubElement(base, "index")
-                index_base = etree.SubElement(index_elem, "base")
+                index_elem = sub_element(base, "index")
+                index_base = sub_element(index_elem, "base")
+                var_ref = sub_element(index_base, "var", ref=expanded_ref)
 
-                # Get the expanded name
-                expanded_ref = self.objectfifo_names.get(arg_ref, arg_ref)
-                var_ref = etree.SubElement(index_base, "var", ref=expanded_ref)
-
-                index_value = etree.SubElement(index_elem, "index_value")
-                const = etree.SubElement(index_value, "const")
+                index_value = sub_element(index_elem, "index_value")
+                const = sub_element(index_value, "const")
                 const.text = index
 
-                # Call: .cons() or .prod()
-                call = etree.SubElement(method_chain, "call")
-                method = etree.SubElement(call, "method", name="cons" if mode == "consumer" else "prod")
-
             # If it's a simple ObjectFifo reference with mode
-            elif mode is not None:
-                method_chain = etree.SubElement(arg_elem, "method_chain")
-                base = etree.SubElement(method_chain, "base")
-                expanded_ref = self.objectfifo_names.get(arg_ref, arg_ref)
-                var = etree.SubElement(base, "var", ref=expanded_ref)
-                call = etree.SubElement(method_chain, "call")
-                method = etree.SubElement(call, "method", name="cons" if mode == "consumer" else "prod")
+            else:
+                var = sub_element(base, "var", ref=expanded_ref)
+
+            # Call: .cons() or .prod()
+            call = sub_element(method_chain, "call")
+            method = sub_element(call, "method", attrib=method_attrib)
 
         # placement
         placement = simple_worker.find("placement").text.strip()
-        placement_elem = etree.SubElement(worker, "placement")
-        match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-        if match:
-            constructor = etree.SubElement(placement_elem, "constructor", ref="Tile")
-            arg_x = etree.SubElement(constructor, "arg")
-            const_x = etree.SubElement(arg_x, "const")
-            const_x.text = match.group(1)
-            arg_y = etree.SubElement(constructor, "arg")
-            const_y = etree.SubElement(arg_y, "const")
-            const_y.text = match.group(2)
+        placement_elem = _SubElement(worker, "placement")
+        self._emit_tile_constructor(placement_elem, placement)
+
+    @staticmethod
+    def _emit_tile_constructor(parent: etree.Element, placement: str):
+        """Emit a Tile(x, y) constructor under parent; nothing if placement doesn't parse."""
+        coords = _parse_tile(placement)
+        if not coords:
+            return
+        constructor = _SubElement(parent, "constructor", attrib=_TILE_CTOR_ATTRIB)
+        for coord in coords:
+            arg = _SubElement(constructor, "arg")
+            const = _SubElement(arg, "const")
+            const.text = coord
+
+    def _emit_placement_kwarg(self, args: etree.Element, placement: str):
+        """Emit placement=Tile(x, y) as a kwarg under args; the kwarg is kept even if placement doesn't parse."""
+        kwarg_placement = _SubElement(args, "kwarg", attrib=_PLACEMENT_KWARG_ATTRIB)
+        self._emit_tile_constructor(kwarg_placement, placement)
 
     def _transform_runtime(self, simple_runtime: etree.Element, parent: etree.Element):
         """Transform Runtime with complete sequence block."""
-        runtime = etree.SubElement(parent, "Runtime", name="rt")
-        instance = etree.SubElement(runtime, "instance")
-        constructor = etree.SubElement(instance, "constructor", ref="Runtime")
+        runtime = _SubElement(parent, "Runtime", name="rt")
+        instance = _SubElement(runtime, "instance")
+        constructor = _SubElement(instance, "constructor", ref="Runtime")
 
         # Add Workers List (collect all workers from DataFlow)
-        workers_list = etree.SubElement(parent, "List", name="Workers")
-        items = etree.SubElement(workers_list, "items")
+        workers_list = _SubElement(parent, "List", name="Workers")
+        items = _SubElement(workers_list, "items")
 
-        # Find all workers in simple dataflow
-        simple_dataflow = self.root.find("DataFlow")
-        if simple_dataflow is not None:
-            for worker in simple_dataflow.findall("Worker"):
-                worker_name = worker.get("name")
-                var = etree.SubElement(items, "var", ref=worker_name)
+        # Workers transformed so far; _transform_worker adds any later ones
+        for worker_name in self._worker_names:
+            var = _SubElement(items, "var", ref=worker_name)
+        self._worker_list_items.append(items)
 
         # Process sequence
         sequence = simple_runtime.find("Sequence")
@@ -1407,59 +1719,71 @@ class XMLTransformer:
     def _transform_sequence(self, simple_seq: etree.Element, parent: etree.Element):
         """Transform Sequence block with fills and drains."""
         # Create SequenceBlock
-        seq_block = etree.SubElement(parent, "SequenceBlock")
+        seq_block = _SubElement(parent, "SequenceBlock")
 
         # Context
-        context = etree.SubElement(seq_block, "context")
-        call = etree.SubElement(context, "call")
-        method = etree.SubElement(call, "method", ref="rt", name="sequence")
+        context = _SubElement(seq_block, "context")
+        call = _SubElement(context, "call")
+        method = _SubElement(call, "method", attrib=_RT_SEQUENCE_ATTRIB)
+
+        # Split and strip each list once; entries stay positional so that
+        # bindings pair with the type at the same index
+        type_names = [t.strip() for t in simple_seq.get("inputs", "").split(",")]
+        bind_names = [b.strip() for b in simple_seq.get("as", "").split(",")]
 
         # Add type args
-        inputs = simple_seq.get("inputs", "")
-        for type_name in inputs.split(","):
-            type_name = type_name.strip()
+        for type_name in type_names:
             if type_name:
-                arg = etree.SubElement(method, "arg")
+                arg = _SubElement(method, "arg")
                 arg.set("type_ref", type_name)
 
         # Bindings
-        bindings = etree.SubElement(seq_block, "bindings")
-        binding_names = simple_seq.get("as", "").split(",")
-        type_names = inputs.split(",")
-        for bind_name, type_name in zip(binding_names, type_names):
-            bind_name = bind_name.strip()
-            type_name = type_name.strip()
+        bindings = _SubElement(seq_block, "bindings")
+        for bind_name, type_name in zip(bind_names, type_names):
             if bind_name and type_name:
-                bind = etree.SubElement(bindings, "bind", name=bind_name)
+                bind = _SubElement(bindings, "bind", name=bind_name)
                 bind.set("type_ref", type_name)
 
         # Body
-        body = etree.SubElement(seq_block, "body")
+        body = _SubElement(seq_block, "body")
+
+        # Sort the operations in one pass over the Sequence; they are emitted
+        # as the first Start, then all Fills, then all Drains
+        start = None
+        fills = []
+        drains = []
+        for child in simple_seq.iterchildren("Start", "Fill", "Drain"):
+            tag = child.tag
+            if tag == "Fill":
+                fills.append(child)
+            elif tag == "Drain":
+                drains.append(child)
+            elif start is None:
+                start = child
 
         # Start operation
-        start = simple_seq.find("Start")
         if start is not None:
             self._transform_start(start, body)
 
         # Fill operations
-        for fill in simple_seq.findall("Fill"):
+        for fill in fills:
             self._transform_fill(fill, body)
 
         # Drain operations
-        for drain in simple_seq.findall("Drain"):
+        for drain in drains:
             self._transform_drain(drain, body)
 
     def _transform_start(self, simple_start: etree.Element, parent: etree.Element):
         """Transform Start operation."""
-        operation = etree.SubElement(parent, "Operation", name="start")
-        target = etree.SubElement(operation, "target")
-        method = etree.SubElement(target, "method", ref="rt", name="start")
+        operation = _SubElement(parent, "Operation", name="start")
+        target = _SubElement(operation, "target")
+        method = _SubElement(target, "method", attrib=_RT_START_ATTRIB)
 
-        args = etree.SubElement(operation, "args")
+        args = _SubElement(operation, "args")
 
         # Add reference to Workers list
-        arg = etree.SubElement(args, "arg")
-        var = etree.SubElement(arg, "var", ref="Workers")
+        arg = _SubElement(args, "arg")
+        var = _SubElement(arg, "var", ref="Workers")
 
     def _transform_fill(self, simple_fill: etree.Element, parent: etree.Element):
         """Transform Fill operation with or without TensorAccessPattern."""
@@ -1469,78 +1793,56 @@ class XMLTransformer:
         use_tap = simple_fill.get("use_tap", "false").lower() == "true"
         # data_ref preserves original parameter name (A, B, etc.) for TAP calculations
         data_ref = simple_fill.get("data_ref", source)
+        tap_var = simple_fill.get("tap_var")
+        placement_elem = simple_fill.find("placement")
 
         # Get expanded target name
         expanded_target = self.objectfifo_names.get(target, target)
 
         operation_name = f"fill_{source}_col{column}"
-        operation = etree.SubElement(parent, "Operation", name=operation_name)
+        operation = _SubElement(parent, "Operation", name=operation_name)
 
         # target
-        target_elem = etree.SubElement(operation, "target")
-        method = etree.SubElement(target_elem, "method", ref="rt", name="fill")
+        target_elem = _SubElement(operation, "target")
+        method = _SubElement(target_elem, "method", attrib=_RT_FILL_ATTRIB)
 
         # args
-        args = etree.SubElement(operation, "args")
-
-        tap_type = simple_fill.get("tap_type", "tap")
-        tap_var = simple_fill.get("tap_var")
+        args = _SubElement(operation, "args")
 
         if use_tap:
             # Complex form with kwargs and TAP/TensorTiler2D
             # placement
-            placement = simple_fill.find("placement").text.strip()
-            kwarg_placement = etree.SubElement(args, "kwarg", name="placement")
-            match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-            if match:
-                constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
-                arg_x = etree.SubElement(constructor, "arg")
-                const_x = etree.SubElement(arg_x, "const")
-                const_x.text = match.group(1)
-                arg_y = etree.SubElement(constructor, "arg")
-                const_y = etree.SubElement(arg_y, "const")
-                const_y.text = match.group(2)
+            self._emit_placement_kwarg(args, placement_elem.text.strip())
 
             # in_fifo
-            kwarg_fifo = etree.SubElement(args, "kwarg", name="in_fifo")
-            var = etree.SubElement(kwarg_fifo, "var", ref=expanded_target)
-            dot = etree.SubElement(kwarg_fifo, "method", name="prod")
+            kwarg_fifo = _SubElement(args, "kwarg", name="in_fifo")
+            var = _SubElement(kwarg_fifo, "var", ref=expanded_target)
+            dot = _SubElement(kwarg_fifo, "method", name="prod")
 
             # source
-            kwarg_source = etree.SubElement(args, "kwarg", name="source")
-            var = etree.SubElement(kwarg_source, "var", ref=source)
+            kwarg_source = _SubElement(args, "kwarg", name="source")
+            var = _SubElement(kwarg_source, "var", ref=source)
 
             # tap — variable reference (tiler2d or named tap) or inline TAP constructor
-            kwarg_tap = etree.SubElement(args, "kwarg", name="tap")
+            kwarg_tap = _SubElement(args, "kwarg", name="tap")
             if tap_var:
-                var_ref = etree.SubElement(kwarg_tap, "var", ref=tap_var)
+                var_ref = _SubElement(kwarg_tap, "var", ref=tap_var)
             else:
                 self._build_tensor_access_pattern(kwarg_tap, data_ref, column)
         else:
             # Simple form with positional args only
             # arg1: ObjectFifo.prod()
-            arg1 = etree.SubElement(args, "arg")
-            call = etree.SubElement(arg1, "call")
-            method = etree.SubElement(call, "method", ref=expanded_target, name="prod")
+            arg1 = _SubElement(args, "arg")
+            call = _SubElement(arg1, "call")
+            method = _SubElement(call, "method", ref=expanded_target, name="prod")
 
             # arg2: source tensor
-            arg2 = etree.SubElement(args, "arg")
-            var = etree.SubElement(arg2, "var", ref=source)
+            arg2 = _SubElement(args, "arg")
+            var = _SubElement(arg2, "var", ref=source)
 
             # placement kwarg (if present)
-            placement_elem = simple_fill.find("placement")
             if placement_elem is not None:
-                placement = placement_elem.text.strip()
-                kwarg_placement = etree.SubElement(args, "kwarg", name="placement")
-                match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-                if match:
-                    constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
-                    arg_x = etree.SubElement(constructor, "arg")
-                    const_x = etree.SubElement(arg_x, "const")
-                    const_x.text = match.group(1)
-                    arg_y = etree.SubElement(constructor, "arg")
-                    const_y = etree.SubElement(arg_y, "const")
-                    const_y.text = match.group(2)
+                self._emit_placement_kwarg(args, placement_elem.text.strip())
 
     def _transform_drain(self, simple_drain: etree.Element, parent: etree.Element):
         """Transform Drain operation with or without TensorAccessPattern."""
@@ -1550,176 +1852,104 @@ class XMLTransformer:
         use_tap = simple_drain.get("use_tap", "false").lower() == "true"
         # data_ref preserves original parameter name (D, etc.) for TAP calculations
         data_ref = simple_drain.get("data_ref", target)
+        tap_var = simple_drain.get("tap_var")
+        wait = simple_drain.find("wait")
+        placement_elem = simple_drain.find("placement")
 
         # Get expanded source name
         expanded_source = self.objectfifo_names.get(source, source)
 
         operation_name = f"drain_{target}_col{column}"
-        operation = etree.SubElement(parent, "Operation", name=operation_name)
+        operation = _SubElement(parent, "Operation", name=operation_name)
 
         # target
-        target_elem = etree.SubElement(operation, "target")
-        method = etree.SubElement(target_elem, "method", ref="rt", name="drain")
+        target_elem = _SubElement(operation, "target")
+        method = _SubElement(target_elem, "method", attrib=_RT_DRAIN_ATTRIB)
 
         # args
-        args = etree.SubElement(operation, "args")
-
-        tap_type = simple_drain.get("tap_type", "tap")
-        tap_var = simple_drain.get("tap_var")
+        args = _SubElement(operation, "args")
 
         if use_tap:
             # Complex form with kwargs and TAP/TensorTiler2D
             # placement
-            placement = simple_drain.find("placement").text.strip()
-            kwarg_placement = etree.SubElement(args, "kwarg", name="placement")
-            match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-            if match:
-                constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
-                arg_x = etree.SubElement(constructor, "arg")
-                const_x = etree.SubElement(arg_x, "const")
-                const_x.text = match.group(1)
-                arg_y = etree.SubElement(constructor, "arg")
-                const_y = etree.SubElement(arg_y, "const")
-                const_y.text = match.group(2)
+            self._emit_placement_kwarg(args, placement_elem.text.strip())
 
             # out_fifo
-            kwarg_fifo = etree.SubElement(args, "kwarg", name="out_fifo")
-            var = etree.SubElement(kwarg_fifo, "var", ref=expanded_source)
-            dot = etree.SubElement(kwarg_fifo, "method", name="cons")
+            kwarg_fifo = _SubElement(args, "kwarg", name="out_fifo")
+            var = _SubElement(kwarg_fifo, "var", ref=expanded_source)
+            dot = _SubElement(kwarg_fifo, "method", name="cons")
 
             # dest
-            kwarg_dest = etree.SubElement(args, "kwarg", name="dest")
-            var = etree.SubElement(kwarg_dest, "var", ref=target)
+            kwarg_dest = _SubElement(args, "kwarg", name="dest")
+            var = _SubElement(kwarg_dest, "var", ref=target)
 
             # wait
-            wait = simple_drain.find("wait")
             if wait is not None:
-                kwarg_wait = etree.SubElement(args, "kwarg", name="wait", value=wait.text.strip().capitalize())
+                kwarg_wait = _SubElement(args, "kwarg", name="wait", value=wait.text.strip().capitalize())
 
             # tap — variable reference (tiler2d or named tap) or inline TAP constructor
-            kwarg_tap = etree.SubElement(args, "kwarg", name="tap")
+            kwarg_tap = _SubElement(args, "kwarg", name="tap")
             if tap_var:
-                var_ref = etree.SubElement(kwarg_tap, "var", ref=tap_var)
+                var_ref = _SubElement(kwarg_tap, "var", ref=tap_var)
             else:
                 self._build_tensor_access_pattern(kwarg_tap, data_ref, column)
         else:
             # Simple form with positional args only
             # arg1: ObjectFifo.cons()
-            arg1 = etree.SubElement(args, "arg")
-            call = etree.SubElement(arg1, "call")
-            method = etree.SubElement(call, "method", ref=expanded_source, name="cons")
+            arg1 = _SubElement(args, "arg")
+            call = _SubElement(arg1, "call")
+            method = _SubElement(call, "method", ref=expanded_source, name="cons")
 
             # arg2: target tensor
-            arg2 = etree.SubElement(args, "arg")
-            var = etree.SubElement(arg2, "var", ref=target)
+            arg2 = _SubElement(args, "arg")
+            var = _SubElement(arg2, "var", ref=target)
 
             # kwarg: wait (if present)
-            wait = simple_drain.find("wait")
             if wait is not None:
-                kwarg_wait = etree.SubElement(args, "kwarg", name="wait", value=wait.text.strip().capitalize())
+                kwarg_wait = _SubElement(args, "kwarg", name="wait", value=wait.text.strip().capitalize())
 
             # placement kwarg (if present)
-            placement_elem = simple_drain.find("placement")
             if placement_elem is not None:
-                placement = placement_elem.text.strip()
-                kwarg_placement = etree.SubElement(args, "kwarg", name="placement")
-                match = re.match(r'Tile\((\d+),\s*(\d+)\)', placement)
-                if match:
-                    constructor = etree.SubElement(kwarg_placement, "constructor", ref="Tile")
-                    arg_x = etree.SubElement(constructor, "arg")
-                    const_x = etree.SubElement(arg_x, "const")
-                    const_x.text = match.group(1)
-                    arg_y = etree.SubElement(constructor, "arg")
-                    const_y = etree.SubElement(arg_y, "const")
-                    const_y.text = match.group(2)
+                self._emit_placement_kwarg(args, placement_elem.text.strip())
 
     def _build_tensor_access_pattern(self, parent: etree.Element, tensor: str, column: str):
         """Build TensorAccessPattern constructor."""
         tensor_ref = self.expander.get_tensor_ref(tensor)
         col_num = int(column)
 
-        constructor = etree.SubElement(parent, "constructor", ref="TensorAccessPattern")
-
-        # tensor_dims
-        kwarg_dims = etree.SubElement(constructor, "kwarg", name="tensor_dims")
-        list_elem = etree.SubElement(kwarg_dims, "list")
-        method = etree.SubElement(list_elem, "method", ref=tensor_ref, name="numel")
-
-        # offset
-        kwarg_offset = etree.SubElement(constructor, "kwarg", name="offset")
-        offset_expr = etree.SubElement(kwarg_offset, "binary_op", op="*")
-        div_expr = etree.SubElement(offset_expr, "binary_op", op="//")
-        method1 = etree.SubElement(div_expr, "method", ref=tensor_ref, name="numel")
-        const_4 = etree.SubElement(div_expr, "const")
-        const_4.text = "4"
-        const_col = etree.SubElement(offset_expr, "const")
-        const_col.text = str(col_num)
-
-        # sizes
-        kwarg_sizes = etree.SubElement(constructor, "kwarg", name="sizes")
-        list_sizes = etree.SubElement(kwarg_sizes, "list")
-
-        # First size: ((tensor.numel() // 4) // (tensor.numel() // 8))
-        size1 = etree.SubElement(list_sizes, "binary_op", op="//")
-        numerator = etree.SubElement(size1, "binary_op", op="//")
-        method2 = etree.SubElement(numerator, "method", ref=tensor_ref, name="numel")
-        const_4_2 = etree.SubElement(numerator, "const")
-        const_4_2.text = "4"
-        denominator = etree.SubElement(size1, "binary_op", op="//")
-        method3 = etree.SubElement(denominator, "method", ref=tensor_ref, name="numel")
-        const_8 = etree.SubElement(denominator, "const")
-        const_8.text = "8"
-
-        # Second size: (tensor.numel() // 8)
-        size2 = etree.SubElement(list_sizes, "binary_op", op="//")
-        method4 = etree.SubElement(size2, "method", ref=tensor_ref, name="numel")
-        const_8_2 = etree.SubElement(size2, "const")
-        const_8_2.text = "8"
-
-        # strides
-        kwarg_strides = etree.SubElement(constructor, "kwarg", name="strides")
-        list_strides = etree.SubElement(kwarg_strides, "list")
-
-        # First stride: (tensor.numel() // 8)
-        stride1 = etree.SubElement(list_strides, "binary_op", op="//")
-        method5 = etree.SubElement(stride1, "method", ref=tensor_ref, name="numel")
-        const_8_3 = etree.SubElement(stride1, "const")
-        const_8_3.text = "8"
-
-        # Second stride: 1
-        const_1 = etree.SubElement(list_strides, "const")
-        const_1.text = "1"
+        # The structure is fixed; copy the template and patch its leaves
+        constructor = deepcopy(_TAP_TEMPLATE)
+        for method in constructor.iter("method"):
+            method.set("ref", tensor_ref)
+        # kwarg offset / binary_op * / column const
+        constructor[1][0][1].text = str(col_num)
+        parent.append(constructor)
 
     def _transform_program(self, simple_program: etree.Element, parent: etree.Element):
         """Transform Program construction."""
-        program = etree.SubElement(parent, "Program", name="my_program")
-        constructor = etree.SubElement(program, "constructor")
-        call = etree.SubElement(constructor, "call")
-        prog_constructor = etree.SubElement(call, "constructor", ref="Program")
+        program = _SubElement(parent, "Program", name="my_program")
+        constructor = _SubElement(program, "constructor")
+        call = _SubElement(constructor, "call")
+        prog_constructor = _SubElement(call, "constructor", ref="Program")
 
         # Device arg
-        arg1 = etree.SubElement(prog_constructor, "arg")
-        call_device = etree.SubElement(arg1, "call")
-        func_device = etree.SubElement(call_device, "function", ref="iron.get_current_device")
+        arg1 = _SubElement(prog_constructor, "arg")
+        call_device = _SubElement(arg1, "call")
+        func_device = _SubElement(call_device, "function", ref="iron.get_current_device")
 
         # Runtime arg
-        arg2 = etree.SubElement(prog_constructor, "arg")
-        var_rt = etree.SubElement(arg2, "var", ref="rt")
+        arg2 = _SubElement(prog_constructor, "arg")
+        var_rt = _SubElement(arg2, "var", ref="rt")
 
         # Resolve program
-        resolve = etree.SubElement(parent, "ResolveProgram")
-        target = etree.SubElement(resolve, "target")
-        method = etree.SubElement(target, "method", ref="my_program", name="resolve_program")
-        arg_placer = etree.SubElement(method, "arg")
-        constructor_placer = etree.SubElement(arg_placer, "constructor", ref="SequentialPlacer")
+        resolve = _SubElement(parent, "ResolveProgram")
+        target = _SubElement(resolve, "target")
+        method = _SubElement(target, "method", ref="my_program", name="resolve_program")
+        arg_placer = _SubElement(method, "arg")
+        constructor_placer = _SubElement(arg_placer, "constructor", ref="SequentialPlacer")
 
-        returns = etree.SubElement(resolve, "returns")
-        symbol = etree.SubElement(returns, "symbol", ref="my_program_resolved")
-
-    def _transform_functions(self, parent: etree.Element):
-        """Transform Function definitions."""
-        for func in self.root.findall("Function"):
-            self._transform_function(func, parent)
+        returns = _SubElement(resolve, "returns")
+        symbol = _SubElement(returns, "symbol", ref="my_program_resolved")
 
     def _transform_function(self, simple_func: etree.Element, parent: etree.Element):
         """Transform individual Function."""
@@ -1730,78 +1960,85 @@ class XMLTransformer:
         # Use entry name if provided, otherwise use name
         expanded_name = entry if entry else name
 
-        func = etree.SubElement(parent, "Function", name=expanded_name)
+        func_attrib = {"name": expanded_name}
         if decorator:
-            func.set("decorator", decorator)
+            func_attrib["decorator"] = decorator
+        func = _SubElement(parent, "Function", func_attrib)
 
         # Parameters
         params = simple_func.find("parameters")
         if params is not None:
-            params_section = etree.SubElement(func, "parameters")
-            for param in params.findall("param"):
-                param_elem = etree.SubElement(params_section, "param", name=param.get("name"))
+            params_section = _SubElement(func, "parameters")
+            for param in params.iterchildren("param"):
+                param_attrib = {"name": param.get("name")}
                 param_type = param.get("type")
                 if param_type:
-                    param_elem.set("type_ref", param_type)
+                    param_attrib["type_ref"] = param_type
+                _SubElement(params_section, "param", param_attrib)
 
         # Attributes (for JIT functions)
         if decorator and "jit" in decorator:
-            attributes = etree.SubElement(func, "attributes")
-            kwarg = etree.SubElement(attributes, "kwarg", name="is_placed", value="False")
+            attributes = _SubElement(func, "attributes")
+            _SubElement(attributes, "kwarg", _IS_PLACED_KWARG_ATTRIB)
 
         # Body
         body = simple_func.find("body")
         if body is not None:
-            body_section = etree.SubElement(func, "body")
+            body_section = _SubElement(func, "body")
 
+            dispatch = self._function_stmt_dispatch.get
             for stmt in body:
-                if stmt.tag == "UseDataFlow":
-                    use_df = etree.SubElement(body_section, "UseDataFlow")
-                    # Need to collect actual type names from Symbols section
-                    symbols_section = self.root.find("Symbols")
-                    if symbols_section is not None:
-                        for type_abs in symbols_section.findall("TypeAbstraction"):
-                            type_name = type_abs.get("name")
-                            use_type = etree.SubElement(use_df, "UseType", name=type_name)
-
-                elif stmt.tag == "Return":
-                    return_elem = etree.SubElement(body_section, "Return")
-                    var = etree.SubElement(return_elem, "var", ref=stmt.text.strip())
-
-                elif stmt.tag == "Assign":
-                    self._transform_assign(stmt, body_section)
-
-                elif stmt.tag == "Tensor":
-                    self._transform_tensor_assign(stmt, body_section)
-
-                elif stmt.tag == "RawLine":
-                    rawline = etree.SubElement(body_section, "RawLine")
-                    rawline.text = stmt.text
-
-                elif stmt.tag == "Call":
-                    self._transform_call(stmt, body_section)
+                handler = dispatch(stmt.tag)
+                if handler is not None:
+                    handler(stmt, body_section)
+
+    def _emit_use_dataflow(self, stmt: etree.Element, parent: etree.Element):
+        """Emit UseDataFlow with a UseType for every TypeAbstraction."""
+        use_df = _SubElement(parent, "UseDataFlow")
+        # Need to collect actual type names from Symbols section
+        for type_name in self._type_names:
+            _SubElement(use_df, "UseType", {"name": type_name})
+
+    def _emit_return(self, stmt: etree.Element, parent: etree.Element):
+        """Emit Return of a single variable."""
+        return_elem = _SubElement(parent, "Return")
+        _SubElement(return_elem, "var", {"ref": stmt.text.strip()})
+
+    def _emit_rawline(self, stmt: etree.Element, parent: etree.Element):
+        """Emit a RawLine verbatim."""
+        rawline = _SubElement(parent, "RawLine")
+        rawline.text = stmt.text
 
     def _transform_assign(self, simple_assign: etree.Element, parent: etree.Element):
         """Transform Assign statement."""
-        assign = etree.SubElement(parent, "Assign")
-        target = etree.SubElement(assign, "target")
+        make = parent.makeelement
+        assign = make("Assign")
+        target = make("target")
         target.text = simple_assign.get("name")
-        source = etree.SubElement(assign, "source")
+        source = make("source")
+        assign.append(target)
+        assign.append(source)
 
         value = simple_assign.get("value")
         if value:
             if value.isdigit():
-                const = etree.SubElement(source, "const")
+                const = make("const")
                 const.text = value
+                source.append(const)
             else:
-                var = etree.SubElement(source, "var", ref=value)
+                source.append(make("var", {"ref": value}))
+        parent.append(assign)
 
     def _transform_tensor_assign(self, simple_tensor: etree.Element, parent: etree.Element):
         """Transform Tensor initialization."""
-        assign = etree.SubElement(parent, "Assign")
-        target = etree.SubElement(assign, "target")
+        make = parent.makeelement
+        assign = make("Assign")
+        target = make("target")
         target.text = simple_tensor.get("name")
-        source = etree.SubElement(assign, "source")
+        source = make("source")
+        assign.append(target)
+        assign.append(source)
+        parent.append(assign)
 
         init = simple_tensor.find("init")
         if init is not None:
@@ -1809,26 +2046,26 @@ class XMLTransformer:
 
     def _transform_call(self, simple_call: etree.Element, parent: etree.Element):
         """Transform Call statement."""
-        call = etree.SubElement(parent, "Call")
+        make = parent.makeelement
+        call = make("Call")
         func_name = simple_call.get("function")
 
         # Resolve function name to entry name if it has one
-        resolved_name = self.function_entry_names.get(func_name, func_name)
+        resolved_name = self._resolve_function_name(func_name, func_name)
 
-        func_elem = etree.SubElement(call, "function", ref=resolved_name)
+        func_elem = make("function", {"ref": resolved_name})
+        call.append(func_elem)
 
-        args_text = simple_call.get("args", "")
-        for arg_name in args_text.split(","):
-            arg_name = arg_name.strip()
-            if arg_name:
-                arg = etree.SubElement(func_elem, "arg")
-                var = etree.SubElement(arg, "var")
-                var.text = arg_name
+        args_text = simple_call.get("args")
+        if args_text:
+            func_elem.extend([_arg_var(make, arg_name)
+                              for arg_name in _LIST_ITEM_RE.findall(args_text)])
+        parent.append(call)
 
     def _parse_function_call(self, call_text: str, parent: etree.Element):
         """Parse function call text and create XML structure."""
         # Find function name (handles dotted names like iron.arange)
-        name_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_.]*)\(', call_text)
+        name_match = _CALL_NAME_RE.match(call_text)
         if not name_match:
             return
 
@@ -1855,33 +2092,32 @@ class XMLTransformer:
         args_text = call_text[open_pos + 1:close_pos]
         chain_text = call_text[close_pos + 1:].strip()  # e.g. ".reshape(256, 256)"
 
-        call_attrs = {"chain": chain_text} if chain_text else {}
-        call = etree.SubElement(parent, "call", **call_attrs)
-        func = etree.SubElement(call, "function", ref=func_name)
-
-        # Parse arguments
-        if args_text.strip():
-            for arg in args_text.split(","):
-                arg = arg.strip()
-                if not arg:
-                    continue
-                if "=" in arg:
-                    # Keyword argument
-                    key, value = arg.split("=", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    kwarg = etree.SubElement(func, "kwarg", name=key)
-                    if value.startswith('"') or value.startswith("'"):
-                        string = etree.SubElement(kwarg, "string")
-                        string.text = value.strip('"').strip("'")
-                    else:
-                        var = etree.SubElement(kwarg, "var")
-                        var.text = value
+        make = parent.makeelement
+        call = make("call", {"chain": chain_text} if chain_text else None)
+        func = make("function", {"ref": func_name})
+        call.append(func)
+
+        # Parse arguments (none for an empty "()")
+        for arg in _LIST_ITEM_RE.findall(args_text) if args_text else ():
+            if "=" in arg:
+                # Keyword argument
+                key, value = arg.split("=", 1)
+                key = key.strip()
+                value = value.strip()
+                kwarg = make("kwarg", {"name": key})
+                if value.startswith('"') or value.startswith("'"):
+                    string = make("string")
+                    string.text = value.strip('"').strip("'")
+                    kwarg.append(string)
                 else:
-                    # Positional argument
-                    arg_elem = etree.SubElement(func, "arg")
-                    var = etree.SubElement(arg_elem, "var")
-                    var.text = arg
+                    var = make("var")
+                    var.text = value
+                    kwarg.append(var)
+                func.append(kwarg)
+            else:
+                # Positional argument
+                func.append(_arg_var(make, arg))
+        parent.append(call)
 
     def _transform_entrypoint(self, parent: etree.Element):
         """Transform EntryPoint."""
@@ -1889,33 +2125,43 @@ class XMLTransformer:
         if simple_ep is None:
             return
 
-        ep = etree.SubElement(parent, "EntryPoint")
+        ep = _SubElement(parent, "EntryPoint")
 
         if_stmt = simple_ep.find("If")
         if if_stmt is not None:
-            if_elem = etree.SubElement(ep, "If", condition=if_stmt.get("condition"))
+            if_elem = _SubElement(ep, "If", {"condition": if_stmt.get("condition")})
             call = if_stmt.find("Call")
             if call is not None:
-                call_elem = etree.SubElement(if_elem, "Call")
+                call_elem = _SubElement(if_elem, "Call")
                 func_name = call.get("function")
                 # Resolve function name to entry name if it has one
-                resolved_name = self.function_entry_names.get(func_name, func_name)
-                func = etree.SubElement(call_elem, "function", ref=resolved_name)
+                resolved_name = self._resolve_function_name(func_name, func_name)
+                _SubElement(call_elem, "function", {"ref": resolved_name})
 
-    def save(self, output_path: Path):
-        """Save complete XML to file."""
-        complete_root = self.transform()
-        tree = etree.ElementTree(complete_root)
-        tree.write(str(output_path),
-                  pretty_print=True,
-                  xml_declaration=True,
-                  encoding='UTF-8')
+    def save(self, output_path: Path, complete_root: Optional[etree.Element] = None):
+        """
+        Save complete XML to file.
+
+        Args:
+            output_path: Destination file
+            complete_root: Result of a previous transform() call; streamed
+                straight to the file via transform_to_file() if omitted
+        """
+        if complete_root is None:
+            self.transform_to_file(output_path)
+            return
+        # Indent in one pass up front so the write itself is a plain serialize;
+        # the result matches pretty_print=True, including the final newline
+        etree.indent(complete_root, space="  ")
+        with open(output_path, "wb") as out:
+            etree.ElementTree(complete_root).write(out,
+                                                   xml_declaration=True,
+                                                   encoding='UTF-8')
+            out.write(b"\n")
 
 
 def main():
     """CLI entry point for XMLGenerator."""
-    import sys
-
     if len(sys.argv) < 2:
         print("Usage: python XMLGenerator.py <simple_xml_path> [output_xml_path]")
         sys.exit(1)
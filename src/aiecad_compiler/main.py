@@ -31,7 +31,7 @@ project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
 from codegen.backends.CodeGenerator import CodeGenerator
-from graph_builder.GraphDriver import GraphBuilder
+from graph_builder.GraphDriver import GraphBuilder, write_graphml
 from graph_builder.XMLGenerator import XMLTransformer
 
 
@@ -95,6 +95,7 @@ def main():
 
     # Step 0: Detect and expand GUI XML if needed
     working_xml_path = xml_path
+    complete_root = None  # In-memory complete XML, handed straight to GraphBuilder
     if _is_gui_xml(xml_path):
         print(f"[0/3] Detected GUI XML - Expanding to complete XML...")
         print(f"      Input: {xml_path}")
@@ -107,9 +108,10 @@ def main():
                 complete_xml_path = xml_path.with_suffix('') / f"{xml_path.stem}_complete.xml"
                 complete_xml_path = xml_path.parent / f"{xml_path.stem}_complete.xml"
 
-            # Transform GUI XML to complete XML
+            # Transform GUI XML to complete XML (still written out for inspection)
             transformer = XMLTransformer(xml_path)
-            transformer.save(complete_xml_path)
+            complete_root = transformer.transform()
+            transformer.save(complete_xml_path, complete_root)
 
             working_xml_path = complete_xml_path
             print(f"      Output: {complete_xml_path}")
@@ -126,23 +128,19 @@ def main():
 
     try:
         builder = GraphBuilder(working_xml_path)
-        graph = builder.build()
+        graph = builder.build(complete_root)
         
         # Save graph to GraphML in same directory as XML
         # Strip _gui suffix if present for output filenames
         base_name = xml_path.stem.replace('_gui', '')
         graphml_path = xml_path.parent / f"{base_name}.graphml"
-        import networkx as nx
-        nx.write_graphml(graph, graphml_path)
+        write_graphml(graph, graphml_path)
         
         print(f"      Output: {graphml_path}")
         print(f"      Graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
         
-        # Show node type distribution
-        node_kinds = {}
-        for _, data in graph.nodes(data=True):
-            kind = data.get('kind', '?')
-            node_kinds[kind] = node_kinds.get(kind, 0) + 1
+        # Show node type distribution (counted by the builder as it went)
+        node_kinds = builder.kind_counts
         
         print(f"      Node types: {len(node_kinds)} unique types")
         print()
@@ -0,0 +1,15 @@
+"""
+Shared setup for the aiecad_compiler Python tests.
+
+The compiler modules import each other relative to src/aiecad_compiler
+(as main.py arranges), so that directory is put on sys.path here.
+"""
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+COMPILER_ROOT = REPO_ROOT / "src" / "aiecad_compiler"
+
+if str(COMPILER_ROOT) not in sys.path:
+    sys.path.insert(0, str(COMPILER_ROOT))
@@ -0,0 +1,262 @@
+"""
+Tests for GraphBuilder (graph_builder/GraphDriver.py).
+"""
+
+from pathlib import Path
+
+import pytest
+
+etree = pytest.importorskip("lxml.etree")
+nx = pytest.importorskip("networkx")
+
+from graph_builder.GraphDriver import GraphBuilder, write_graphml
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _build(xml: str):
+    """Build a graph from an in-memory complete-XML string."""
+    root = etree.fromstring(xml)
+    return GraphBuilder(Path("inline.xml")).build(root)
+
+
+def _has_arg_targets(graph, owner_kind: str):
+    """Labels of the has_arg targets of the single node of kind owner_kind."""
+    owner = next(n for n, d in graph.nodes(data=True) if d["kind"] == owner_kind)
+    return [graph.nodes[dst]["label"]
+            for _, dst, d in graph.out_edges(owner, data=True)
+            if d["type"] == "has_arg"]
+
+
+OPERATION_ARGS_XML = """
+<Module name="m">
+  <DataFlow>
+    <SequenceBlock>
+      <body>
+        <Operation name="fill_a">
+          <target>
+            <method ref="rt" name="fill"/>
+          </target>
+          <args>
+            <arg>
+              <var/>
+            </arg>
+            <arg>
+              <const>3</const>
+            </arg>
+            <arg>
+              <var ref="a_in"/>
+            </arg>
+          </args>
+        </Operation>
+      </body>
+    </SequenceBlock>
+  </DataFlow>
+</Module>
+"""
+
+
+def test_operation_args_only_link_named_vars(tmp_path):
+    graph = _build(OPERATION_ARGS_XML)
+
+    # A ref-less <var> and a <const> are not operation arguments
+    assert _has_arg_targets(graph, "Operation") == ["a_in"]
+    assert not any(d["kind"] == "ConstExpr" for _, d in graph.nodes(data=True))
+    assert all(d["label"] is not None for _, d in graph.nodes(data=True))
+
+    write_graphml(graph, tmp_path / "out.graphml")
+
+
+def test_constructor_args_link_consts_and_vars():
+    graph = _build("""
+<Module name="m">
+  <DataFlow>
+    <SequenceBlock>
+      <body>
+        <Operation name="fill_a">
+          <args>
+            <kwarg name="placement">
+              <constructor ref="Tile">
+                <arg>
+                  <const>0</const>
+                </arg>
+                <arg>
+                  <var ref="col"/>
+                </arg>
+                <arg>
+                  <method ref="t" name="m"/>
+                </arg>
+              </constructor>
+            </kwarg>
+          </args>
+        </Operation>
+      </body>
+    </SequenceBlock>
+  </DataFlow>
+</Module>
+""")
+
+    assert _has_arg_targets(graph, "Constructor") == ["0", "col"]
+    assert not any(d["kind"] == "MethodCall" for _, d in graph.nodes(data=True))
+
+
+# Complete XML → the GraphML committed next to it. These goldens were
+# produced by the recursive builder and pin node ids, labels, attributes
+# and edge order, which the explicit-stack walks must reproduce.
+GOLDEN_DESIGNS = [
+    ("Example_Designs/MLP.ironsmith/codegen/MLP_complete.xml",
+     "Example_Designs/MLP.ironsmith/codegen/MLP.graphml"),
+    ("Example_Designs/MLP_updated.ironsmith/codegen/MLP_updated_complete.xml",
+     "Example_Designs/MLP_updated.ironsmith/codegen/MLP_updated.graphml"),
+    ("src/aiecad_compiler/examples/applications/add_activate/add_activate.xml",
+     "src/aiecad_compiler/examples/applications/add_activate/add_activate.graphml"),
+    ("src/aiecad_compiler/examples/applications/add_activate2/add_activate_complete.xml",
+     "src/aiecad_compiler/examples/applications/add_activate2/add_activate.graphml"),
+    ("src/aiecad_compiler/examples/applications/hlir_add_activate/add_activate_complete.xml",
+     "src/aiecad_compiler/examples/applications/hlir_add_activate/add_activate.graphml"),
+    ("src/aiecad_compiler/examples/applications/hlir_matrix_vector_mul/matrix_vector_mul_complete.xml",
+     "src/aiecad_compiler/examples/applications/hlir_matrix_vector_mul/matrix_vector_mul.graphml"),
+    ("src/aiecad_compiler/examples/applications/hlir_passthrough/passthrough_complete.xml",
+     "src/aiecad_compiler/examples/applications/hlir_passthrough/passthrough.graphml"),
+    ("src/aiecad_compiler/examples/applications/hlir_vector_exp/vector_exp_complete.xml",
+     "src/aiecad_compiler/examples/applications/hlir_vector_exp/vector_exp.graphml"),
+    ("src/aiecad_compiler/examples/applications/hlir_vector_vector_mul/vector_vector_mul_complete.xml",
+     "src/aiecad_compiler/examples/applications/hlir_vector_vector_mul/vector_vector_mul.graphml"),
+    ("src/aiecad_compiler/examples/applications/passthrough/passthrough.xml",
+     "src/aiecad_compiler/examples/applications/passthrough/passthrough.graphml"),
+    ("src/aiecad_compiler/examples/applications/passthrough2/passthrough_complete.xml",
+     "src/aiecad_compiler/examples/applications/passthrough2/passthrough.graphml"),
+    ("tests/hlir_bridge/output/add_activate_test_complete.xml",
+     "tests/hlir_bridge/output/add_activate_test.graphml"),
+    ("tests/hlir_bridge/output/bridge_test_output.xml",
+     "tests/hlir_bridge/output/bridge_test_output.graphml"),
+    ("tests/hlir_bridge/output/dual_path_forward_test_complete.xml",
+     "tests/hlir_bridge/output/dual_path_forward_test.graphml"),
+    ("tests/hlir_bridge/output/matrix_vector_mul_test_complete.xml",
+     "tests/hlir_bridge/output/matrix_vector_mul_test.graphml"),
+    ("tests/hlir_bridge/output/passthrough_test_complete.xml",
+     "tests/hlir_bridge/output/passthrough_test.graphml"),
+    ("tests/hlir_bridge/output/vector_exp_test_complete.xml",
+     "tests/hlir_bridge/output/vector_exp_test.graphml"),
+    ("tests/hlir_bridge/output/vector_vector_mul_test_complete.xml",
+     "tests/hlir_bridge/output/vector_vector_mul_test.graphml"),
+]
+
+
+def _ordered(graph):
+    """Nodes and edges with their attributes, in insertion order."""
+    return list(graph.nodes(data=True)), list(graph.edges(data=True))
+
+
+@pytest.mark.parametrize("xml_path, graphml_path", GOLDEN_DESIGNS,
+                         ids=[Path(x).parent.name + "/" + Path(x).name for x, _ in GOLDEN_DESIGNS])
+def test_graph_matches_golden(tmp_path, xml_path, graphml_path):
+    xml_path = REPO_ROOT / xml_path
+    graphml_path = REPO_ROOT / graphml_path
+    expected = _ordered(nx.read_graphml(graphml_path))
+
+    # Streamed from the file (iterparse) and from an in-memory tree
+    streamed = GraphBuilder(xml_path).build()
+    in_memory = GraphBuilder(xml_path).build(etree.parse(str(xml_path)).getroot())
+    assert _ordered(streamed) == expected
+    assert _ordered(in_memory) == expected
+
+    out = tmp_path / "out.graphml"
+    write_graphml(streamed, out)
+    assert out.read_bytes() == graphml_path.read_bytes()
+
+
+NESTED_EXPRESSIONS_XML = """
+<Module name="m">
+  <Function name="f">
+    <body>
+      <Assign>
+        <target>y</target>
+        <source>
+          <call>
+            <function name="g">
+              <arg><const>1</const></arg>
+              <kwarg name="k"><binary_op op="+"><var ref="x"/><const>2</const></binary_op></kwarg>
+              <arg><const>3</const></arg>
+            </function>
+          </call>
+        </source>
+      </Assign>
+      <Assign>
+        <target>z</target>
+        <source>
+          <binary_op op="*">
+            <function name="h">
+              <arg><var ref="y"/></arg>
+              <kwarg name="s"><const>6</const></kwarg>
+              <arg><const>4</const></arg>
+            </function>
+            <const>5</const>
+          </binary_op>
+        </source>
+      </Assign>
+    </body>
+  </Function>
+</Module>
+"""
+
+
+def test_nested_expression_ids_follow_document_order():
+    # Ids and edge order as produced by the recursive expression walk
+    graph = _build(NESTED_EXPRESSIONS_XML)
+
+    assert list(graph.nodes) == [
+        "Module_1", "Function_2", "Expr_3", "Call_4", "FunctionCall_5",
+        "ConstExpr_6", "BinaryOp_7", "VarRef_8", "ConstExpr_9", "Kwarg_10",
+        "ConstExpr_11", "Assign_12", "Variable_13", "Expr_14", "BinaryOp_15",
+        "FunctionCallExpr_16", "VarRef_17", "ConstExpr_18", "KwargExpr_19",
+        "ConstExpr_20", "ConstExpr_21", "Assign_22", "Variable_23",
+    ]
+    assert [(src, dst, d["type"]) for src, dst, d in graph.edges(data=True)] == [
+        ("Module_1", "Function_2", "contains"),
+        ("Function_2", "Assign_12", "contains"),
+        ("Function_2", "Assign_22", "contains"),
+        ("Expr_3", "Call_4", "contains"),
+        ("Call_4", "FunctionCall_5", "calls"),
+        ("Call_4", "ConstExpr_6", "has_arg"),
+        ("Call_4", "Kwarg_10", "has_kwarg"),
+        ("Call_4", "ConstExpr_11", "has_arg"),
+        ("BinaryOp_7", "VarRef_8", "operand"),
+        ("BinaryOp_7", "ConstExpr_9", "operand"),
+        ("Kwarg_10", "BinaryOp_7", "contains"),
+        ("Assign_12", "Expr_3", "source"),
+        ("Assign_12", "Variable_13", "assigns"),
+        ("Variable_13", "Variable_13", "defines"),
+        ("Expr_14", "BinaryOp_15", "contains"),
+        ("BinaryOp_15", "FunctionCallExpr_16", "operand"),
+        ("BinaryOp_15", "ConstExpr_21", "operand"),
+        ("FunctionCallExpr_16", "VarRef_17", "arg"),
+        ("FunctionCallExpr_16", "KwargExpr_19", "kwarg"),
+        ("FunctionCallExpr_16", "ConstExpr_20", "arg"),
+        ("KwargExpr_19", "ConstExpr_18", "value"),
+        ("Assign_22", "Expr_14", "source"),
+        ("Assign_22", "Variable_23", "assigns"),
+        ("Variable_23", "Variable_23", "defines"),
+    ]
+
+
+@pytest.mark.parametrize("label", ["x\x0cy", "x\x00y", "x\ufffey"])
+def test_write_graphml_rejects_xml_illegal_characters(tmp_path, label):
+    graph = nx.DiGraph()
+    graph.add_node("Const_1", kind="ConstExpr", label=label)
+
+    # Same failure as nx.write_graphml, not a file nx.read_graphml rejects
+    with pytest.raises(ValueError):
+        nx.write_graphml(graph, tmp_path / "nx.graphml")
+    with pytest.raises(ValueError):
+        write_graphml(graph, tmp_path / "out.graphml")
+
+
+def test_write_graphml_escapes_like_networkx(tmp_path):
+    graph = nx.DiGraph()
+    graph.add_node('a"<&>\t\r\n', label='v"<&>\t\r\n\x7f')
+    graph.add_edge('a"<&>\t\r\n', "b", type="x")
+
+    write_graphml(graph, tmp_path / "out.graphml")
+    nx.write_graphml(graph, tmp_path / "nx.graphml")
+    assert (tmp_path / "out.graphml").read_bytes() == (tmp_path / "nx.graphml").read_bytes()
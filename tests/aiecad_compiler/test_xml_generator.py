@@ -0,0 +1,135 @@
+"""
+Tests for XMLTransformer (graph_builder/XMLGenerator.py).
+"""
+
+from pathlib import Path
+
+import pytest
+
+etree = pytest.importorskip("lxml.etree")
+
+from graph_builder.XMLGenerator import NamingConventions, XMLTransformer
+
+
+def _transform(tmp_path, xml: str):
+    """Transform a simple (GUI) XML string into the complete <Module>."""
+    path = tmp_path / "design_gui.xml"
+    path.write_text(xml, encoding="utf-8")
+    return XMLTransformer(path).transform()
+
+
+@pytest.mark.parametrize("value, source_tag", [
+    ("128", "const"),
+    ("1²", "const"),  # str.isdigit() accepts superscript digits
+    ("²", "const"),
+    ("-5", "var"),
+    ("bfloat16", "var"),
+])
+def test_assign_value_kind(tmp_path, value, source_tag):
+    module = _transform(tmp_path, f"""
+<Module name="m">
+  <Function name="f">
+    <body>
+      <Assign name="x" value="{value}"/>
+    </body>
+  </Function>
+</Module>
+""")
+    source = module.find("Function/body/Assign/source")
+    assert [child.tag for child in source] == [source_tag]
+
+
+def test_naming_generators_return_fresh_lists():
+    attrs = {"data": "A", "column": "1"}
+    outputs = NamingConventions.generate_split_output_names(attrs, 2)
+    assert outputs == ["MEM_L2_L1_A3_col1", "MEM_L2_L1_A4_col1"]
+
+    # Cached results must not leak: mutating one result leaves the next intact
+    outputs.append("extra")
+    assert NamingConventions.generate_split_output_names(attrs, 2) == \
+        ["MEM_L2_L1_A3_col1", "MEM_L2_L1_A4_col1"]
+    assert NamingConventions.generate_join_input_names({}, 2) == ["join_in1", "join_in2"]
+
+
+def test_objectfifo_name_follows_templates():
+    assert NamingConventions.generate_objectfifo_name(
+        {"context": "L3_L2", "data": "A", "column": "0"}) == "SHIM_L3_L2_A1A2_col0"
+    assert NamingConventions.generate_objectfifo_name(
+        {"context": "L1_L1", "stage": "add_to_relu", "worker": "1"}) == "L1_L1_add_to_relu_1"
+
+    class CustomNaming(NamingConventions):
+        OBJECTFIFO_TEMPLATES = {
+            **NamingConventions.OBJECTFIFO_TEMPLATES,
+            "L3_L2": "in_{data}{workers}_c{column}",
+            "L1_L1": "{stage}-{worker}",
+        }
+
+    assert CustomNaming.generate_objectfifo_name(
+        {"context": "L3_L2", "data": "A", "column": "0"}) == "in_A1A2_c0"
+    assert CustomNaming.generate_objectfifo_name(
+        {"context": "L3_L2", "data": "A", "column": "x"}) == "in_A_cx"
+    assert CustomNaming.generate_objectfifo_name(
+        {"context": "L1_L1", "stage": "add_to_relu", "worker": "1"}) == "add_to_relu-1"
+    # The base class is unaffected by the subclass's cached names
+    assert NamingConventions.generate_objectfifo_name(
+        {"context": "L3_L2", "data": "A", "column": "0"}) == "SHIM_L3_L2_A1A2_col0"
+
+
+def test_split_chain_keeps_empty_text(tmp_path):
+    module = _transform(tmp_path, """
+<Module name="m">
+  <DataFlow>
+    <ObjectFifoSplit name="a_fifos" data="A">
+      <source>inA</source>
+      <num_outputs>2</num_outputs>
+      <output_type> </output_type>
+      <placement>Tile(0, 1)</placement>
+    </ObjectFifoSplit>
+  </DataFlow>
+</Module>
+""")
+    split = module.find("DataFlow/ObjectFifo/source/method_chain/call/method[@name='split']")
+    type_refs = split.findall("kwarg[@name='obj_types']/list/type_ref")
+    assert [t.text for t in type_refs] == ["", ""]
+    assert b"<type_ref></type_ref>" in etree.tostring(split)
+    assert [c.text for c in split.iterfind("kwarg[@name='placement']/constructor/arg/const")] == ["0", "1"]
+
+
+# A GUI design with Symbols, DataFlow (Workers and a Runtime) and Functions
+STREAMING_DESIGN = Path(__file__).resolve().parents[1] / "hlir_bridge/output/add_activate_test_gui.xml"
+
+
+def _variant(name):
+    """A GUI design reshaped to hit a particular streaming case."""
+    root = etree.parse(str(STREAMING_DESIGN)).getroot()
+    dataflow = root.find("DataFlow")
+    if name == "runtime_first":
+        runtime = dataflow.find("Runtime")
+        dataflow.remove(runtime)
+        dataflow.insert(0, runtime)
+    elif name == "empty_dataflow":
+        for child in list(dataflow):
+            dataflow.remove(child)
+        etree.SubElement(dataflow, "Unknown")
+    elif name == "functions_only":
+        for child in list(root):
+            if child.tag != "Function":
+                root.remove(child)
+    elif name == "empty_module":
+        root = etree.Element("Module", name="m")
+    return root
+
+
+@pytest.mark.parametrize("variant", ["as_is", "runtime_first", "empty_dataflow",
+                                     "functions_only", "empty_module"])
+def test_streamed_file_matches_saved_tree(tmp_path, variant):
+    path = tmp_path / "design_gui.xml"
+    etree.ElementTree(_variant(variant)).write(str(path))
+
+    streamed = tmp_path / "streamed.xml"
+    XMLTransformer(path).save(streamed)
+    saved = tmp_path / "saved.xml"
+    transformer = XMLTransformer(path)
+    transformer.save(saved, transformer.transform())
+
+    assert streamed.read_bytes() == saved.read_bytes()